@@ -0,0 +1,439 @@
+"""
+Helpers for the text files shared between the Oblivion client and the game mod.
+
+The mod and the client only share the Archipelago save directory, so every
+exchange goes through small files named `<prefix>_<kind>.txt`. The helpers here
+keep the client's side of those files cheap to read as sessions grow.
+"""
+
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .WriteBehind import WriteBehindWriter
+
+
+class BridgeStatusReader:
+    """Incremental reader for the mod's comma-separated `<prefix>_bridge_status.txt`.
+
+    The mod only ever extends that file, so the reader keeps a checkpoint (byte offset
+    after the last complete token, parsed counts, a fingerprint of the file) and only
+    parses the appended tail. The last token may not be comma terminated yet; it is
+    counted but re-read on the next call. If the file shrinks, is replaced, or its
+    fingerprint no longer matches, the reader falls back to a full reparse.
+    """
+
+    FINGERPRINT_BYTES = 32
+
+    def __init__(self, path: str):
+        self.path = path
+        self.full_reads = 0
+        self.incremental_reads = 0
+        self.reset()
+
+    def reset(self):
+        self.counts: Counter = Counter()
+        self.offset = 0
+        self.tail = ""
+        self._head = b""
+        self._anchor = b""
+        self._identity: Optional[Tuple[int, int]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _matches_checkpoint(self, f) -> bool:
+        if self._head:
+            if f.read(len(self._head)) != self._head:
+                return False
+        if self._anchor:
+            f.seek(self.offset - len(self._anchor))
+            if f.read(len(self._anchor)) != self._anchor:
+                return False
+        return True
+
+    def read(self) -> Counter:
+        """Bring the counts up to date with the file and return them."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return self.counts
+
+        identity = (st.st_dev, st.st_ino) if st.st_ino else None
+        signature = (st.st_size, st.st_mtime_ns)
+        if identity == self._identity and signature == self._signature:
+            return self.counts
+
+        with open(self.path, "rb") as f:
+            incremental = (
+                self._signature is not None
+                and identity == self._identity
+                and st.st_size >= self.offset
+                and self._matches_checkpoint(f)
+            )
+            if incremental:
+                self.incremental_reads += 1
+                if self.tail:
+                    # The unterminated token is parsed again together with the new data
+                    self.counts[self.tail] -= 1
+                    if self.counts[self.tail] <= 0:
+                        del self.counts[self.tail]
+            else:
+                self.full_reads += 1
+                self.reset()
+            f.seek(self.offset)
+            data = f.read()
+
+        split = data.rfind(b",")
+        complete, remainder = (data[:split + 1], data[split + 1:]) if split >= 0 else (b"", data)
+        for token in complete.decode("utf-8", "replace").split(","):
+            token = token.strip()
+            if token:
+                self.counts[token] += 1
+        self.offset += len(complete)
+        self.tail = remainder.decode("utf-8", "replace").strip()
+        if self.tail:
+            self.counts[self.tail] += 1
+
+        # Fingerprint the checkpoint so an in-place rewrite is detected next time
+        with open(self.path, "rb") as f:
+            self._head = f.read(min(self.offset, self.FINGERPRINT_BYTES))
+            anchor_len = min(self.offset, self.FINGERPRINT_BYTES)
+            f.seek(self.offset - anchor_len)
+            self._anchor = f.read(anchor_len)
+        self._identity = identity
+        self._signature = signature
+        return self.counts
+
+
+class RotatingFileConsumer:
+    """Loss-free consumer for an append-only file the mod keeps adding lines to.
+
+    Instead of reading the file and deleting it afterwards (which drops anything the
+    mod appends in between), the consumer first renames it to `<name>_processing<ext>`.
+    The rename is atomic, so later appends from the mod land in a fresh file, and
+    every line is parsed exactly once. The claimed file is only removed by commit()
+    after its lines were handled; if processing is interrupted it is picked up again
+    by the next claim().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        base, ext = os.path.splitext(path)
+        self.claimed_path = f"{base}_processing{ext}"
+
+    def pending(self) -> bool:
+        """Whether the mod has written lines that are not claimed yet."""
+        return os.path.exists(self.path)
+
+    def claim(self) -> Optional[List[str]]:
+        """Take ownership of the unprocessed lines. Returns None when there is nothing to do."""
+        if not os.path.exists(self.claimed_path):
+            try:
+                os.replace(self.path, self.claimed_path)
+            except FileNotFoundError:
+                return None
+            except PermissionError:
+                # The mod is holding the file open (Windows) - try again on the next wake
+                return None
+        with open(self.claimed_path, "r") as f:
+            return [line.strip() for line in f if line.strip()]
+
+    def commit(self):
+        """Drop the claimed lines once they have been handled."""
+        try:
+            os.remove(self.claimed_path)
+        except FileNotFoundError:
+            pass
+
+
+def count_queue_lines(lines: Iterable[str]) -> Counter:
+    """Item counts in `_items.txt` lines, which are either `name` or `name|count`."""
+    counts: Counter = Counter()
+    for line in lines:
+        name, separator, count = line.rpartition("|")
+        if separator and count.isdigit():
+            counts[name] += int(count)
+        else:
+            counts[line] += 1
+    return counts
+
+
+def group_queue_items(items: Iterable[str]) -> List[str]:
+    """Collapse repeated items into `name|count` lines, in order of first appearance."""
+    return [name if count == 1 else f"{name}|{count}" for name, count in Counter(items).items()]
+
+
+def compact_queue_file(path: str) -> Tuple[int, int]:
+    """Rewrite a queue file with duplicates collapsed. Returns the line counts before and after.
+
+    Only safe while the mod is not reading the file and when it understands `name|count`.
+    """
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    compacted = [name if count == 1 else f"{name}|{count}" for name, count in count_queue_lines(lines).items()]
+    if len(compacted) < len(lines):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("".join(f"{line}\n" for line in compacted))
+        os.replace(tmp_path, path)
+    return len(lines), min(len(lines), len(compacted))
+
+
+class ItemEventRing:
+    """Fixed-size ring buffer behind `<prefix>_item_events_ring.txt`.
+
+    `_item_events.txt` grows by one line per transfer for the whole connection. The ring
+    file instead holds a `head=<events written> capacity=<slots>` line followed by exactly
+    `capacity` slot lines; event number n (counting from 1) lives in slot (n - 1) % capacity
+    as `<n>|<event>`, and unused slots are blank. The mod remembers the last n it showed and
+    reads only newer slots, so its cost per read is bounded by the capacity.
+
+    The file is rewritten whole (tmp file + replace) so the mod never sees a torn slot;
+    bursts of events are coalesced into one rewrite per `delay`, done on the BridgeIO
+    thread when one is given.
+    """
+
+    def __init__(self, path: str, capacity: int = 200, delay: float = 0.05, io=None):
+        self.path = path
+        self.capacity = capacity
+        self.delay = delay
+        self.io = io
+        self.head = 0
+        self._slots: List[str] = [""] * capacity
+        self._dirty = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self.rewrites = 0
+        self._load()
+
+    def _load(self):
+        """Continue an existing ring (client restart) so event numbers never go backwards."""
+        try:
+            with open(self.path, "r") as f:
+                lines = [line.rstrip("\n") for line in f]
+        except OSError:
+            return
+        header = dict(field.partition("=")[::2] for field in lines[0].split()) if lines else {}
+        if not header.get("head", "").isdigit():
+            return
+        self.head = int(header["head"])
+        for line in lines[1:]:
+            number, separator, _event = line.partition("|")
+            if separator and number.isdigit() and self.head - self.capacity < int(number) <= self.head:
+                self._slots[(int(number) - 1) % self.capacity] = line
+
+    def append(self, line: str):
+        self.head += 1
+        self._slots[(self.head - 1) % self.capacity] = f"{self.head}|{line}"
+        self._dirty = True
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._handle = loop.call_later(self.delay, self._on_timer)
+
+    def _on_timer(self):
+        self._handle = None
+        if self.io is not None and self._dirty:
+            self.io.submit(self._write, self._render())
+        else:
+            self.flush()
+
+    def entries(self) -> List[str]:
+        """Events still in the ring, oldest first."""
+        start = max(0, self.head - self.capacity)
+        return [self._slots[n % self.capacity].partition("|")[2] for n in range(start, self.head)]
+
+    def delete(self):
+        """Drop the ring and its file (end of the connection)."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._dirty = False
+        if self.io is not None:
+            # Behind any rewrite still queued on the I/O thread
+            self.io.submit(self._remove)
+        else:
+            self._remove()
+
+    def _remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _render(self) -> str:
+        self._dirty = False
+        return f"head={self.head} capacity={self.capacity}\n" + "".join(f"{slot}\n" for slot in self._slots)
+
+    def _write(self, text: str):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self.rewrites += 1
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._dirty:
+            self._write(self._render())
+
+
+class ModHeartbeat:
+    """Liveness of the mod, from the `<prefix>_heartbeat.txt` file it touches while the game runs.
+
+    Mods that never write a heartbeat are always considered online, so clients keep writing
+    for them as before. The heartbeat may list optional mod features as a
+    `features=<name>,<name>` line (e.g. `item_counts` for `name|count` queue lines).
+
+    `refresh()` does the file I/O (the client runs it on the bridge I/O thread);
+    `online()` and `features()` only read what the last refresh saw.
+    """
+
+    def __init__(self, path: str, timeout: float):
+        self.path = path
+        self.timeout = timeout
+        self._beat: Optional[float] = None
+        self._features: Set[str] = set()
+        self._features_mtime: Optional[float] = None
+
+    def refresh(self):
+        """Stat the heartbeat and re-read its features if it changed."""
+        beat = self.last_beat()
+        if beat is not None and beat != self._features_mtime:
+            self._features_mtime = beat
+            try:
+                with open(self.path, "r") as f:
+                    for line in f:
+                        key, _, value = line.strip().partition("=")
+                        if key == "features":
+                            self._features = {feature.strip() for feature in value.split(",") if feature.strip()}
+            except OSError:
+                pass
+        self._beat = beat
+
+    def features(self) -> Set[str]:
+        """Features announced in the heartbeat file as of the last refresh."""
+        return self._features
+
+    def last_beat(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def online(self, now: Optional[float] = None) -> bool:
+        if self._beat is None:
+            return True
+        return (now if now is not None else time.time()) - self._beat <= self.timeout
+
+
+class BridgeTransport(ABC):
+    """How the client talks to the mod. The client only goes through this interface, so the
+    wire format (plain text files, journals, ...) can be negotiated per session."""
+
+    name = "base"
+    # Whether items carry their items_received index and the mod acknowledges it
+    sequenced = False
+    # Whether the mod's acknowledged index is durable enough to resume delivery from
+    resumes_from_ack = False
+    # Whether claiming/committing completions touches files (and belongs on the I/O thread)
+    file_backed = True
+
+    def watched_files(self) -> List[str]:
+        """File names in the save directory whose changes mean the mod sent something."""
+        return []
+
+    @abstractmethod
+    def send_items(self, items: List[str], index: Optional[int] = None):
+        """Queue item tokens; `index` is the items_received entry they were expanded from."""
+
+    @abstractmethod
+    def send_traps(self, traps: List[Tuple[int, str]]):
+        """Queue (items_received index, trap code) pairs."""
+
+    @abstractmethod
+    def send_deathlink(self):
+        pass
+
+    @abstractmethod
+    def send_item_event(self, line: str):
+        pass
+
+    @abstractmethod
+    def claim_completions(self) -> Optional[List[str]]:
+        """Completion lines from the mod not yet committed, or None if there are none."""
+
+    @abstractmethod
+    def commit_completions(self):
+        """Mark the lines returned by the last claim_completions() as handled."""
+
+    @abstractmethod
+    def completions_pending(self) -> bool:
+        pass
+
+    def close(self):
+        pass
+
+
+class LegacyFileTransport(BridgeTransport):
+    """The original one-file-per-purpose text protocol (`_items.txt`, `_traps.txt`,
+    `_deathlink.txt`, `_item_events.txt`, `_completed.txt`)."""
+
+    name = "files"
+
+    def __init__(self, directory: str, prefix: str, writer: Optional[WriteBehindWriter] = None):
+        self.directory = directory
+        self.prefix = prefix
+        self.writer = writer
+        # Write repeated items as `name|count` (only when the mod announced support)
+        self.counted_items = False
+        # Write item events to a bounded ring file instead of `_item_events.txt` (mod opt-in)
+        self.event_ring: Optional[ItemEventRing] = None
+        self.items_path = os.path.join(directory, f"{prefix}_items.txt")
+        self.traps_path = os.path.join(directory, f"{prefix}_traps.txt")
+        self.deathlink_path = os.path.join(directory, f"{prefix}_deathlink.txt")
+        self.item_events_path = os.path.join(directory, f"{prefix}_item_events.txt")
+        self.completions = RotatingFileConsumer(os.path.join(directory, f"{prefix}_completed.txt"))
+
+    def watched_files(self) -> List[str]:
+        return [os.path.basename(self.completions.path)]
+
+    def _append_lines(self, path: str, lines: List[str]):
+        if self.writer is not None:
+            self.writer.append_lines(path, lines)
+            return
+        with open(path, "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+
+    def send_items(self, items: List[str], index: Optional[int] = None):
+        self._append_lines(self.items_path, group_queue_items(items) if self.counted_items else items)
+
+    def send_traps(self, traps: List[Tuple[int, str]]):
+        # The mod reads the file, executes each trap, then deletes it
+        self._append_lines(self.traps_path, [trap_code for _index, trap_code in traps])
+
+    def send_deathlink(self):
+        # A blank signal file that the mod will detect and delete
+        with open(self.deathlink_path, "w") as f:
+            f.write("")
+
+    def send_item_event(self, line: str):
+        if self.event_ring is not None:
+            self.event_ring.append(line)
+            return
+        self._append_lines(self.item_events_path, [line])
+
+    def claim_completions(self) -> Optional[List[str]]:
+        return self.completions.claim()
+
+    def commit_completions(self):
+        self.completions.commit()
+
+    def completions_pending(self) -> bool:
+        return self.completions.pending()
@@ -0,0 +1,131 @@
+"""
+Off-loop file I/O for the client <-> mod bridge.
+
+The asyncio loop drives the server websocket and the Kivy UI as well as the bridge,
+so a slow `open` on a Proton, network or NTFS mounted save directory stalls pings
+and redraws. BridgeIO runs blocking bridge file work on one dedicated thread:
+
+- one thread keeps operations in submission order, so appends, renames and
+  rewrites of the same file never race each other
+- `await io.run(fn, ...)` for work whose result the loop needs
+- `io.submit(fn, ...)` for fire-and-forget work (buffered flushes)
+
+LoopLagMonitor measures how late the loop wakes up from short sleeps, which is
+what users feel as stutter; `/oblivion` reports it next to the I/O counters.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger("Client")
+
+T = TypeVar("T")
+
+
+class BridgeIO:
+    """Single-thread executor for blocking bridge file I/O."""
+
+    def __init__(self, name: str = "bridge-io"):
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_id: Optional[int] = None
+        self.queued = 0
+        # Metrics
+        self.jobs = 0
+        self.busy_time = 0.0
+        self.peak_busy = 0.0
+        self.peak_queued = 0
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+        return self._executor
+
+    def on_io_thread(self) -> bool:
+        return threading.get_ident() == self._thread_id
+
+    def _timed(self, fn: Callable[..., T], *args) -> T:
+        self._thread_id = threading.get_ident()
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queued -= 1
+            self.jobs += 1
+            self.busy_time += elapsed
+            self.peak_busy = max(self.peak_busy, elapsed)
+
+    def submit(self, fn: Callable[..., T], *args) -> Future:
+        """Queue `fn(*args)` behind all earlier I/O. Runs inline when already on the I/O thread."""
+        if self.on_io_thread():
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        # Run in the submitter's context, so e.g. the daemon's per-slot log prefix carries over
+        return self._ensure_executor().submit(self._timed, contextvars.copy_context().run, fn, *args)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run `fn(*args)` on the I/O thread and wait for its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def close(self):
+        """Finish queued I/O and stop the thread (a later submit starts a new one)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up from a short sleep."""
+
+    def __init__(self, interval: float = 0.25, window: int = 240):
+        self.interval = interval
+        self.recent = deque(maxlen=window)
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def recent_max(self) -> float:
+        return max(self.recent, default=0.0)
+
+    @property
+    def recent_mean(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._sample(), name="loop lag monitor")
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.recent.append(lag)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
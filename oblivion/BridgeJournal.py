@@ -0,0 +1,356 @@
+"""
+Journal protocol (bridge protocol v2) between the Oblivion client and the game mod.
+
+Instead of one text file per purpose, each direction uses a single append-only
+journal in the save directory:
+
+- `<prefix>_to_mod.journal`   client -> mod (items, traps, deathlinks, item events)
+- `<prefix>_from_mod.journal` mod -> client (completions)
+
+Every frame is one line: `<seq>\\t<kind>\\t<payload>\\n`. Sequence numbers increase
+monotonically per journal; a line without its trailing newline is still being
+written and is left for the next read. Each side acknowledges what it applied by
+writing an `ack` frame (payload: highest peer seq applied) into its own journal, so
+both sides only ever read frames past their last position. Once everything in a
+journal is acknowledged, its writer compacts it by atomically replacing the file;
+the first line of a journal names its generation, so readers notice the
+replacement and restart from the top, skipping sequence numbers already seen.
+
+Items and traps carry their index in the session's items_received list, and the
+mod reports the highest index it applied with a `received` frame. Deciding whether
+an item still has to be delivered is then a single comparison against that index,
+without reading back any queue file.
+
+The client advertises v2 through `bridge_protocol=2` in the settings file and only
+switches once the mod has written a `hello` frame. Until then (and for mods that
+never upgrade) the plain text files are used through LegacyFileTransport.
+"""
+
+import os
+import re
+import uuid
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .Bridge import BridgeTransport, RotatingFileConsumer
+from .WriteBehind import WriteBehindWriter
+
+BRIDGE_PROTOCOL_VERSION = 2
+
+# Frame kinds
+JOURNAL = "journal"      # seq 0 header, payload: "<generation> <last seq at creation>"
+HELLO = "hello"          # payload: protocol version
+ACK = "ack"              # payload: highest peer seq applied
+ITEM = "item"            # payload: "<items_received index>\t<token>[\t<token>...]" (index may be empty)
+TRAP = "trap"            # payload: "<items_received index>\t<trap code>"
+RECEIVED = "received"    # payload: highest items_received index applied by the mod
+DEATHLINK = "deathlink"
+EVENT = "event"          # payload: item event line (sent/received/found)
+COMPLETED = "completed"  # payload: completion line, same format as _completed.txt
+
+# Journals are compacted once larger than this and acknowledged frames make up enough of them
+COMPACT_THRESHOLD = 64 * 1024
+# Share of the file that compaction must remove to be worth a new generation
+COMPACT_MIN_DROP = 0.5
+# Compaction keeps the newest frame of these kinds, they describe the writer's state
+STATE_KINDS = (HELLO, ACK, RECEIVED)
+
+
+class Frame(NamedTuple):
+    seq: int
+    kind: str
+    payload: str = ""
+
+
+_UNESCAPE = {"t": "\t", "n": "\n", "r": "\r", "\\": "\\"}
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\(.)", lambda m: _UNESCAPE.get(m.group(1), m.group(1)), text)
+
+
+def encode_frames(frames: Iterable[Frame]) -> bytes:
+    return "".join(f"{frame.seq}\t{frame.kind}\t{_escape(frame.payload)}\n" for frame in frames).encode("utf-8")
+
+
+def parse_frames(data: bytes) -> Tuple[List[Frame], int]:
+    """Parse complete frames from `data`. Returns the frames and the number of bytes consumed."""
+    frames = []
+    consumed = data.rfind(b"\n") + 1
+    for line in data[:consumed].decode("utf-8", "replace").split("\n"):
+        parts = line.rstrip("\r").split("\t", 2)
+        if len(parts) < 2 or not parts[0].isdigit():
+            continue
+        frames.append(Frame(int(parts[0]), parts[1], _unescape(parts[2]) if len(parts) > 2 else ""))
+    return frames, consumed
+
+
+class JournalWriter:
+    """Append side of a journal. Recovers its sequence number from the file on open."""
+
+    def __init__(self, path: str, writer: Optional[WriteBehindWriter] = None):
+        self.path = path
+        self.writer = writer
+        self.last_seq = 0
+        self.acked = 0
+        # The peer ack the journal was last compacted (or checked) against
+        self.compacted_acked = 0
+        self.generation = ""
+        self.recovered: List[Frame] = []
+        self._recover()
+
+    def _recover(self):
+        if self.writer is not None:
+            self.writer.flush(self.path)
+        try:
+            with open(self.path, "rb") as f:
+                frames, _ = parse_frames(f.read())
+        except FileNotFoundError:
+            frames = []
+        if not frames or frames[0].kind != JOURNAL:
+            self._rewrite([])
+            return
+        self.generation = frames[0].payload
+        self.recovered = frames[1:]
+        # The header also records the last seq at compaction time, in case every frame was dropped
+        base = self.generation.rpartition(" ")[2]
+        self.last_seq = max([frame.seq for frame in self.recovered] + [int(base) if base.isdigit() else 0])
+
+    def _rewrite(self, frames: List[Frame]):
+        self.generation = f"{uuid.uuid4().hex[:12]} {self.last_seq}"
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_frames([Frame(0, JOURNAL, self.generation)] + frames))
+        os.replace(tmp_path, self.path)
+
+    def append(self, entries: Iterable[Tuple[str, str]]) -> int:
+        """Append (kind, payload) entries as frames. Returns the last sequence number written."""
+        frames = []
+        for kind, payload in entries:
+            self.last_seq += 1
+            frames.append(Frame(self.last_seq, kind, payload))
+        if frames and self.writer is not None:
+            self.writer.append(self.path, encode_frames(frames))
+        elif frames:
+            with open(self.path, "ab") as f:
+                f.write(encode_frames(frames))
+        return self.last_seq
+
+    def compact(self, force: bool = False) -> bool:
+        """Drop acknowledged frames. The newest ack frame is kept so the writer can recover it.
+
+        Every compaction starts a new generation, which makes the peer re-read the journal, so
+        unless forced it only happens when the peer acknowledged more since the last check
+        and the acknowledged frames make up a meaningful part of the file.
+        """
+        try:
+            if not force and (self.acked <= self.compacted_acked or os.path.getsize(self.path) < COMPACT_THRESHOLD):
+                return False
+            if self.writer is not None and not self.writer.flush(self.path):
+                return False
+            with open(self.path, "rb") as f:
+                data = f.read()
+            frames, _ = parse_frames(data)
+        except FileNotFoundError:
+            data, frames = b"", []
+        checked_acked = self.acked
+        state = {}
+        keep = []
+        for frame in frames:
+            if frame.kind == JOURNAL:
+                continue
+            if frame.kind in STATE_KINDS:
+                state[frame.kind] = frame
+            if frame.seq > self.acked:
+                keep.append(frame)
+        keep = sorted([frame for frame in state.values() if frame not in keep], key=lambda frame: frame.seq) + keep
+        if not force and len(data) - len(encode_frames(keep)) < len(data) * COMPACT_MIN_DROP:
+            # Mostly unacknowledged frames: keep the generation, look again after the next ack
+            self.compacted_acked = checked_acked
+            return False
+        try:
+            self._rewrite(keep)
+        except PermissionError:
+            # The peer holds the file open (Windows); try again next time
+            return False
+        self.compacted_acked = checked_acked
+        return True
+
+
+class JournalReader:
+    """Read side of a journal. Tracks the byte offset and the last sequence number seen."""
+
+    def __init__(self, path: str, last_seq: int = 0):
+        self.path = path
+        self.last_seq = last_seq
+        self.offset = 0
+        self.generation: Optional[str] = None
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def pending(self) -> bool:
+        signature = self._stat()
+        return signature is not None and signature != self._signature
+
+    def read(self) -> List[Frame]:
+        """Frames appended since the last read (sequence numbers already seen are skipped)."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return []
+        with open(self.path, "rb") as f:
+            header_line = f.readline()
+            header, _ = parse_frames(header_line)
+            if not header or header[0].kind != JOURNAL:
+                # Header not written completely yet
+                return []
+            if header[0].payload != self.generation or signature[0] < self.offset:
+                # New or compacted journal: start over, seq numbers filter what we already saw
+                self.generation = header[0].payload
+                self.offset = len(header_line)
+            f.seek(self.offset)
+            data = f.read()
+        frames, consumed = parse_frames(data)
+        self.offset += consumed
+        # A trailing partial frame means the file must be read again next time
+        self._signature = signature if consumed == len(data) else None
+        new_frames = [frame for frame in frames if frame.seq > self.last_seq]
+        if new_frames:
+            self.last_seq = new_frames[-1].seq
+        return new_frames
+
+
+def split_indexed(payload: str) -> Tuple[Optional[int], List[str]]:
+    """Split an item/trap payload into its items_received index and values."""
+    index, _, rest = payload.partition("\t")
+    return (int(index) if index.isdigit() else None), rest.split("\t")
+
+
+def _max_index(frames: Iterable[Frame], kinds: Tuple[str, ...]) -> int:
+    highest = -1
+    for frame in frames:
+        if frame.kind in kinds:
+            index = split_indexed(frame.payload)[0] if frame.kind != RECEIVED else \
+                (int(frame.payload) if frame.payload.isdigit() else None)
+            if index is not None:
+                highest = max(highest, index)
+    return highest
+
+
+def _journal_paths(directory: str, prefix: str) -> Tuple[str, str]:
+    return (os.path.join(directory, f"{prefix}_to_mod.journal"),
+            os.path.join(directory, f"{prefix}_from_mod.journal"))
+
+
+def mod_supports_journal(directory: str, prefix: str) -> bool:
+    """Whether the mod has announced the journal protocol for this session."""
+    _, from_mod_path = _journal_paths(directory, prefix)
+    if not os.path.exists(from_mod_path):
+        return False
+    try:
+        return any(frame.kind == HELLO and frame.payload.isdigit()
+                   and int(frame.payload) >= BRIDGE_PROTOCOL_VERSION
+                   for frame in JournalReader(from_mod_path).read())
+    except OSError:
+        return False
+
+
+class JournalTransport(BridgeTransport):
+    """Client side of the journal protocol."""
+
+    name = "journal"
+    sequenced = True
+    resumes_from_ack = True
+
+    def __init__(self, directory: str, prefix: str, writer: Optional[WriteBehindWriter] = None):
+        self.directory = directory
+        self.prefix = prefix
+        to_mod_path, from_mod_path = _journal_paths(directory, prefix)
+        self.to_mod = JournalWriter(to_mod_path, writer)
+        # Our own acks record how far into the mod's journal we already applied
+        acked = [frame for frame in self.to_mod.recovered if frame.kind == ACK and frame.payload.isdigit()]
+        self.applied_seq = int(acked[-1].payload) if acked else 0
+        self.from_mod = JournalReader(from_mod_path, last_seq=self.applied_seq)
+        # Highest items_received index written to the journal, and the highest the mod applied
+        self.sent_index = _max_index(self.to_mod.recovered, (ITEM, TRAP))
+        self.delivered_index = _max_index(JournalReader(from_mod_path).read(), (RECEIVED,))
+        self.to_mod.recovered = []
+        self.mod_version = 0
+        self._inbox: List[str] = []
+        self._inbox_seq = self.applied_seq
+        self._claimed: Optional[List[str]] = None
+        self._claimed_seq = self.applied_seq
+        # Compatibility shim: drain completions the mod wrote before switching protocols
+        self._legacy_completions = RotatingFileConsumer(os.path.join(directory, f"{prefix}_completed.txt"))
+        self._legacy_claimed = False
+
+    def watched_files(self) -> List[str]:
+        return [os.path.basename(self.from_mod.path), os.path.basename(self._legacy_completions.path)]
+
+    def _pump(self):
+        for frame in self.from_mod.read():
+            if frame.kind == COMPLETED:
+                self._inbox.append(frame.payload)
+            elif frame.kind == ACK and frame.payload.isdigit():
+                self.to_mod.acked = max(self.to_mod.acked, int(frame.payload))
+            elif frame.kind == HELLO and frame.payload.isdigit():
+                self.mod_version = int(frame.payload)
+            elif frame.kind == RECEIVED and frame.payload.isdigit():
+                self.delivered_index = max(self.delivered_index, int(frame.payload))
+            self._inbox_seq = frame.seq
+        self.to_mod.compact()
+
+    def next_item_index(self) -> int:
+        """First items_received index that is neither applied by the mod nor waiting in the journal."""
+        self._pump()
+        return max(self.sent_index, self.delivered_index) + 1
+
+    def send_items(self, items: List[str], index: Optional[int] = None):
+        if index is None:
+            self.to_mod.append((ITEM, f"\t{item}") for item in items)
+            return
+        self.to_mod.append([(ITEM, "\t".join([str(index)] + list(items)))])
+        self.sent_index = max(self.sent_index, index)
+
+    def send_traps(self, traps: List[Tuple[int, str]]):
+        self.to_mod.append((TRAP, f"{index}\t{code}") for index, code in traps)
+        self.sent_index = max([self.sent_index] + [index for index, _code in traps])
+
+    def send_deathlink(self):
+        self.to_mod.append([(DEATHLINK, "")])
+
+    def send_item_event(self, line: str):
+        self.to_mod.append([(EVENT, line)])
+
+    def claim_completions(self) -> Optional[List[str]]:
+        if self._claimed is None:
+            self._pump()
+            legacy = self._legacy_completions.claim()
+            self._legacy_claimed = legacy is not None
+            lines = (legacy or []) + self._inbox
+            if not lines and not self._legacy_claimed and self._inbox_seq == self.applied_seq:
+                return None
+            self._claimed = lines
+            self._claimed_seq = self._inbox_seq
+            self._inbox = []
+        return self._claimed
+
+    def commit_completions(self):
+        if self._legacy_claimed:
+            self._legacy_completions.commit()
+            self._legacy_claimed = False
+        if self._claimed_seq > self.applied_seq:
+            self.applied_seq = self._claimed_seq
+            self.to_mod.append([(ACK, str(self.applied_seq))])
+        self._claimed = None
+
+    def completions_pending(self) -> bool:
+        return bool(self._inbox) or self.from_mod.pending() or self._legacy_completions.pending()
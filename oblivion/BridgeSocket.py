@@ -0,0 +1,268 @@
+"""
+Loopback socket transport for the client <-> mod bridge (optional).
+
+Polling files in a Proton-mounted Documents folder is the main source of bridge
+latency. When enabled (`--bridge-socket`), the client listens on a loopback TCP
+port (or a Unix socket, for Linux tooling) and advertises it to the mod as
+`bridge_socket=<address>` in `current_connection.txt`, next to a random
+`bridge_token=<token>` generated per listener. A mod that connects speaks the
+journal protocol's frames over the connection instead of through files:
+
+- the mod opens with `hello` (payload: "<protocol version> <file prefix> <token>");
+  connections without the listener's token are dropped, so other local processes
+  cannot inject completions. Unix sockets are created inside a private (0700)
+  directory, so they are never reachable by other users, even before binding
+  completes. A line longer than MAX_LINE_BYTES drops the connection, so a peer
+  cannot make the client buffer unbounded data before the token is checked.
+- client -> mod: item, trap, deathlink, event, ack
+- mod -> client: completed, ack, received
+
+Items and traps carry their items_received index. Frames stay in the client's
+outbox until the mod acks their sequence number, and are sent again when the mod
+reconnects; the mod skips indices at or below what it already applied. While no
+mod is connected the client keeps using the file transports, so nothing changes
+for mods without socket support.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import shutil
+import tempfile
+from typing import Callable, List, Optional, Set, Tuple
+
+from .Bridge import BridgeTransport
+from .BridgeJournal import (ACK, BRIDGE_PROTOCOL_VERSION, COMPLETED, DEATHLINK, EVENT, HELLO, ITEM, RECEIVED,
+                            TRAP, Frame, encode_frames, parse_frames, split_indexed)
+
+logger = logging.getLogger("Client")
+
+# Longest frame line accepted from the mod (the hello included)
+MAX_LINE_BYTES = 64 * 1024
+
+
+class SocketTransport(BridgeTransport):
+    """Client side of the socket bridge. Outlives individual mod connections."""
+
+    name = "socket"
+    sequenced = True
+    file_backed = False
+
+    def __init__(self, on_activity: Optional[Callable[[], None]] = None):
+        self.on_activity = on_activity
+        self.prefix: Optional[str] = None
+        self.mod_version = 0
+        self.last_seq = 0
+        self.acked = 0
+        self.delivered_index = -1
+        self._outbox: List[Frame] = []
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._inbox: List[str] = []
+        self._inbox_seq = 0
+        self.applied_seq = 0
+        self._claimed: Optional[List[str]] = None
+        self._claimed_seq = 0
+        self.frames_sent = 0
+        self.frames_received = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    def attach(self, writer: asyncio.StreamWriter, prefix: str, version: int, hello_seq: int):
+        """A mod connected: resend everything it has not acknowledged yet."""
+        if self.prefix != prefix:
+            self.reset()
+        if hello_seq <= self._inbox_seq:
+            # The mod restarted its sequence numbers (game restart)
+            self._inbox_seq = hello_seq
+            self.applied_seq = min(self.applied_seq, hello_seq)
+            self._claimed_seq = min(self._claimed_seq, hello_seq)
+        self._writer = writer
+        self.prefix = prefix
+        self.mod_version = version
+        self._write(self._outbox)
+
+    def detach(self, writer: asyncio.StreamWriter):
+        if self._writer is writer:
+            self._writer = None
+
+    def reset(self):
+        """Forget all protocol state (new session)."""
+        self._outbox = []
+        self.last_seq = self.acked = 0
+        self.delivered_index = -1
+        self._inbox = []
+        self._inbox_seq = self.applied_seq = self._claimed_seq = 0
+        self._claimed = None
+
+    def take_undelivered(self) -> List[int]:
+        """Drop unacknowledged item/trap frames and return their items_received indices.
+
+        Used when falling back to the file transports, which then deliver those items.
+        """
+        indices = [index for index in (split_indexed(frame.payload)[0] for frame in self._outbox
+                                       if frame.kind in (ITEM, TRAP))
+                   if index is not None and index > self.delivered_index]
+        self._outbox = [frame for frame in self._outbox if frame.kind not in (ITEM, TRAP)]
+        return indices
+
+    def _write(self, frames: List[Frame]):
+        if frames and self.connected:
+            self._writer.write(encode_frames(frames))
+            self.frames_sent += len(frames)
+
+    def _send(self, entries):
+        frames = []
+        for kind, payload in entries:
+            self.last_seq += 1
+            frames.append(Frame(self.last_seq, kind, payload))
+        self._outbox.extend(frames)
+        self._write(frames)
+
+    def receive(self, frames: List[Frame]):
+        """Apply frames read from the mod."""
+        activity = False
+        for frame in frames:
+            self.frames_received += 1
+            if frame.seq <= self._inbox_seq:
+                continue
+            if frame.kind == COMPLETED:
+                self._inbox.append(frame.payload)
+                activity = True
+            elif frame.kind == ACK and frame.payload.isdigit():
+                self.acked = max(self.acked, int(frame.payload))
+                self._outbox = [pending for pending in self._outbox if pending.seq > self.acked]
+            elif frame.kind == RECEIVED and frame.payload.isdigit():
+                self.delivered_index = max(self.delivered_index, int(frame.payload))
+            self._inbox_seq = frame.seq
+        if activity and self.on_activity:
+            self.on_activity()
+
+    def send_items(self, items: List[str], index: Optional[int] = None):
+        if index is None:
+            self._send((ITEM, f"\t{item}") for item in items)
+        else:
+            self._send([(ITEM, "\t".join([str(index)] + list(items)))])
+
+    def send_traps(self, traps: List[Tuple[int, str]]):
+        self._send((TRAP, f"{index}\t{code}") for index, code in traps)
+
+    def send_deathlink(self):
+        self._send([(DEATHLINK, "")])
+
+    def send_item_event(self, line: str):
+        self._send([(EVENT, line)])
+
+    def claim_completions(self) -> Optional[List[str]]:
+        if self._claimed is None:
+            if not self._inbox and self._inbox_seq == self.applied_seq:
+                return None
+            self._claimed, self._inbox = self._inbox, []
+            self._claimed_seq = self._inbox_seq
+        return self._claimed
+
+    def commit_completions(self):
+        if self._claimed_seq > self.applied_seq:
+            self.applied_seq = self._claimed_seq
+            self._send([(ACK, str(self.applied_seq))])
+        self._claimed = None
+
+    def completions_pending(self) -> bool:
+        return bool(self._inbox)
+
+
+class SocketBridgeServer:
+    """Accepts the mod's connection on a loopback address."""
+
+    def __init__(self, kind: str = "tcp", unix_path: Optional[str] = None, port: int = 0,
+                 on_activity: Optional[Callable[[], None]] = None):
+        self.kind = kind
+        # Without an explicit path, the socket goes into a private directory made by start()
+        self.unix_path = unix_path
+        self._socket_dir: Optional[str] = None
+        self.port = port
+        self.address = ""
+        # Shared with the mod through current_connection.txt; the hello must carry it
+        self.token = secrets.token_hex(16)
+        self.transport = SocketTransport(on_activity)
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self) -> str:
+        if self.kind == "unix":
+            if self.unix_path is None:
+                # mkdtemp creates the directory 0700: nobody else can reach the socket
+                self._socket_dir = tempfile.mkdtemp(prefix="oblivion_ap_")
+                self.unix_path = os.path.join(self._socket_dir, "bridge.sock")
+            elif os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_path)
+            os.chmod(self.unix_path, 0o600)
+            self.address = f"unix:{self.unix_path}"
+        else:
+            self._server = await asyncio.start_server(self._handle, host="127.0.0.1", port=self.port)
+            port = self._server.sockets[0].getsockname()[1]
+            self.address = f"tcp:127.0.0.1:{port}"
+        return self.address
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for handler in list(self._handlers):
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self.kind == "unix" and self.unix_path and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+            self.unix_path = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        transport = self.transport
+        buffer = b""
+        attached = False
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                frames, consumed = parse_frames(buffer + data)
+                buffer = (buffer + data)[consumed:]
+                if len(buffer) > MAX_LINE_BYTES:
+                    logger.warning("[Bridge] Dropped socket connection sending an oversized frame")
+                    break
+                if not attached:
+                    hello = frames[0] if frames else None
+                    if hello is None:
+                        continue
+                    version, _, rest = hello.payload.partition(" ")
+                    prefix, _, token = rest.rpartition(" ")
+                    if hello.kind != HELLO or not version.isdigit() or int(version) < BRIDGE_PROTOCOL_VERSION \
+                            or not secrets.compare_digest(token.encode(), self.token.encode()):
+                        logger.warning("[Bridge] Rejected socket connection without a valid hello")
+                        break
+                    if transport.connected:
+                        logger.info("[Bridge] Mod reconnected over the socket bridge, replacing the old connection")
+                    transport.attach(writer, prefix, int(version), hello.seq)
+                    attached = True
+                    self.connections += 1
+                    logger.info(f"[Bridge] Mod connected over {self.address}")
+                    frames = frames[1:]
+                transport.receive(frames)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            if attached:
+                transport.detach(writer)
+                logger.info("[Bridge] Mod disconnected from the socket bridge, using files")
+            writer.close()
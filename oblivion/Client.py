@@ -2,14 +2,43 @@ import asyncio
 import os
 import platform
 import time
-from typing import Dict, List, Set
+from collections import Counter, deque
+from typing import Dict, List, Optional, Set
 from CommonClient import CommonContext, server_loop, gui_enabled, ClientCommandProcessor, logger, get_base_parser
 from MultiServer import mark_raw
 from NetUtils import ClientStatus
 
 # Import for tracker functionality
-from . import Items, Locations
+from . import Completions, Items, Locations
 from .Rules import set_rules
+from .FileWatcher import FileWatcher, start_file_watcher
+from .BridgeIO import BridgeIO, LoopLagMonitor
+from .SingleFlight import SingleFlight
+from .StateStore import open_state_store
+from .WriteBehind import WriteBehindWriter
+from .Bridge import (BridgeStatusReader, BridgeTransport, ItemEventRing, LegacyFileTransport, ModHeartbeat,
+                     compact_queue_file, count_queue_lines)
+from .BridgeJournal import BRIDGE_PROTOCOL_VERSION, JournalTransport, mod_supports_journal
+from .BridgeSocket import SocketBridgeServer
+from .SavePath import find_proton_save_path
+from .DeathLink import DEFAULT_INCOMING_COOLDOWN, DEFAULT_OUTGOING_COOLDOWN, DeathLinkPipeline
+from .Progressive import PROGRESSIVE_LEVELS, expand_progressive, max_level as progressive_max_level
+from .SessionFiles import archive_usage, collect_sessions, format_size, index_sessions, restore_session
+from .Completions import CompletionRouter, Route
+
+# Safety rescan interval for the completion file when no change notification arrives
+COMPLETION_RESCAN_INTERVAL = 5.0
+# Seconds before a check the server has not confirmed yet is sent again
+PENDING_CHECK_RESEND_INTERVAL = 15.0
+# How often the mod is asked to touch its heartbeat file, and how many missed beats mean offline
+MOD_HEARTBEAT_INTERVAL = 5
+MOD_HEARTBEAT_MISSES = 3
+# Item events kept while the mod is offline (older ones are dropped, they are only notifications)
+MAX_OFFLINE_ITEM_EVENTS = 200
+# Sessions whose files are kept in the save directory besides the active one
+DEFAULT_SESSION_RETENTION = 10
+# Slots in <prefix>_item_events_ring.txt, for mods that read item events from the ring
+ITEM_EVENT_RING_CAPACITY = 200
 
 class OblivionTracker:
     """Tracker for Oblivion Remastered logic and items."""
@@ -682,6 +711,8 @@ class OblivionTracker:
             return
         from Utils import async_start
         async_start(self.ctx.send_msgs([{ "cmd": "LocationScouts", "locations": to_scout_ids, "create_as_hint": create_as_hint }]))
+        if hasattr(self.ctx, '_persist_shop_scouts'):
+            self.ctx._persist_shop_scouts({loc_id: None for loc_id in to_scout_ids})
         for loc_id in to_scout_ids:
             self.hinted_shop_location_ids.add(loc_id)
             if create_as_hint == 2:  # Only add to hinted_location_ids if actually creating hints
@@ -1291,30 +1322,9 @@ class OblivionTracker:
 
 
 def _find_proton_save_path():
-    """Auto-detect Oblivion save path in Proton prefix (Linux)."""
-    import glob
-    
-    # The unique Proton path signature for Oblivion Remastered (2623190 is the Steam App ID)
-    pattern = "steamapps/compatdata/2623190/pfx/drive_c/users/steamuser/Documents/My Games/Oblivion Remastered/Saved"
-    
-    # Search common Steam library locations
-    home = os.path.expanduser("~")
-    search_roots = [
-        f"{home}/.local/share/Steam",                                            # Standard Steam
-        f"{home}/.steam/debian-installation/",                                   # Debian
-        f"{home}/.var/app/com.valvesoftware.Steam/.local/share/Steam",           # Flatpak
-        f"{home}/snap/steam/common/.local/share/Steam",                          # Snap
-        "/mnt/*",
-        "/media/*"
-    ]
-    
-    for root in search_roots:
-        full_pattern = f"{root}/{pattern}"
-        matches = glob.glob(full_pattern)
-        if matches:
-            return os.path.join(matches[0], "Archipelago")
-    
-    return None
+    """Auto-detect Oblivion save path in Proton prefix (Linux), cached between launches."""
+    from Utils import cache_path
+    return find_proton_save_path(cache_path("oblivion", "save_path_cache.json"))
 
 
 def _load_path_override(default_path: str) -> tuple[str, str]:
@@ -1345,6 +1355,105 @@ def _load_path_override(default_path: str) -> tuple[str, str]:
     return custom_path, f"Path override loaded: {custom_path}"
 
 
+# Completion token mapping: mod token -> location name (shared by all sessions)
+COMPLETION_TOKENS = {
+    "APAzuraCompletionToken": "Azura Quest Complete",
+    "APBoethiaCompletionToken": "Boethia Quest Complete", 
+    "APClavicusVileCompletionToken": "Clavicus Vile Quest Complete",
+    "APHermaeusMoraCompletionToken": "Hermaeus Mora Quest Complete",
+    "APHircineCompletionToken": "Hircine Quest Complete",
+    "APMalacathCompletionToken": "Malacath Quest Complete",
+    "APMephalaCompletionToken": "Mephala Quest Complete",
+    "APMeridiaCompletionToken": "Meridia Quest Complete",
+    "APMolagBalCompletionToken": "Molag Bal Quest Complete",
+    "APNamiraCompletionToken": "Namira Quest Complete",
+    "APNocturnalCompletionToken": "Nocturnal Quest Complete",
+    "APPeryiteCompletionToken": "Peryite Quest Complete",
+    "APSanguineCompletionToken": "Sanguine Quest Complete",
+    "APSheogorathCompletionToken": "Sheogorath Quest Complete", 
+    "APVaerminaCompletionToken": "Vaermina Quest Complete",
+    # Arena checks
+    "APArenaMatch1Victory": "Arena Match 1 Victory",
+    "APArenaMatch2Victory": "Arena Match 2 Victory",
+    "APArenaMatch3Victory": "Arena Match 3 Victory",
+    "APArenaMatch4Victory": "Arena Match 4 Victory",
+    "APArenaMatch5Victory": "Arena Match 5 Victory",
+    "APArenaMatch6Victory": "Arena Match 6 Victory",
+    "APArenaMatch7Victory": "Arena Match 7 Victory",
+    "APArenaMatch8Victory": "Arena Match 8 Victory",
+    "APArenaMatch9Victory": "Arena Match 9 Victory",
+    "APArenaMatch10Victory": "Arena Match 10 Victory",
+    "APArenaMatch11Victory": "Arena Match 11 Victory",
+    "APArenaMatch12Victory": "Arena Match 12 Victory",
+    "APArenaMatch13Victory": "Arena Match 13 Victory",
+    "APArenaMatch14Victory": "Arena Match 14 Victory",
+    "APArenaMatch15Victory": "Arena Match 15 Victory",
+    "APArenaMatch16Victory": "Arena Match 16 Victory",
+    "APArenaMatch17Victory": "Arena Match 17 Victory",
+    "APArenaMatch18Victory": "Arena Match 18 Victory",
+    "APArenaMatch19Victory": "Arena Match 19 Victory",
+    "APArenaMatch20Victory": "Arena Match 20 Victory",
+    "APArenaMatch21Victory": "Arena Match 21 Victory",
+    # Progressive Shop Stock checks (mod tokens stay same, only Python mapping changes)
+    "APShopTokenValue1CompletionToken": "Innkeeper Shop Item Value 1",
+    "APShopTokenValue10CompletionToken": "Innkeeper Shop Item Value 10", 
+    "APShopTokenValue100CompletionToken": "Innkeeper Shop Item Value 100",
+    "APShopTokenValue2CompletionToken": "Innkeeper Shop Item Value 2",
+    "APShopTokenValue20CompletionToken": "Innkeeper Shop Item Value 20",
+    "APShopTokenValue200CompletionToken": "Innkeeper Shop Item Value 200",
+    "APShopTokenValue3CompletionToken": "Innkeeper Shop Item Value 3",
+    "APShopTokenValue30CompletionToken": "Innkeeper Shop Item Value 30",
+    "APShopTokenValue300CompletionToken": "Innkeeper Shop Item Value 300",
+    "APShopTokenValue4CompletionToken": "Innkeeper Shop Item Value 4",
+    "APShopTokenValue40CompletionToken": "Innkeeper Shop Item Value 40",
+    "APShopTokenValue400CompletionToken": "Innkeeper Shop Item Value 400",
+    "APShopTokenValue5CompletionToken": "Innkeeper Shop Item Value 5",
+    "APShopTokenValue50CompletionToken": "Innkeeper Shop Item Value 50",
+    "APShopTokenValue500CompletionToken": "Innkeeper Shop Item Value 500",
+    # Main Quest checks
+    "Deliver the Amulet": "Deliver the Amulet",
+    "Breaking the Siege of Kvatch: Gate Closed": "Breaking the Siege of Kvatch: Gate Closed",
+    "Breaking the Siege of Kvatch": "Breaking the Siege of Kvatch",
+    "Find the Heir": "Find the Heir",
+    "Weynon Priory": "Weynon Priory",
+    "Battle for Castle Kvatch": "Battle for Castle Kvatch",
+    # MQ05
+    "The Path of Dawn: Acquire Commentaries Vol I": "The Path of Dawn: Acquire Commentaries Vol I",
+    "The Path of Dawn: Acquire Commentaries Vol II": "The Path of Dawn: Acquire Commentaries Vol II",
+    "The Path of Dawn: Acquire Commentaries Vol III": "The Path of Dawn: Acquire Commentaries Vol III",
+    "The Path of Dawn: Acquire Commentaries Vol IV": "The Path of Dawn: Acquire Commentaries Vol IV",
+    "The Path of Dawn": "The Path of Dawn",
+    # MQ06
+    "Dagon Shrine: Mysterium Xarxes Acquired": "Dagon Shrine: Mysterium Xarxes Acquired",
+    "Dagon Shrine: Kill Harrow": "Dagon Shrine: Kill Harrow",
+    "Dagon Shrine": "Dagon Shrine",
+    # MQ07 Spies
+    "Spies: Kill Saveri Faram": "Spies: Kill Saveri Faram",
+    "Spies: Kill Jearl": "Spies: Kill Jearl",
+    "Spies": "Spies",
+    # MQ07+ and event/milestone completions
+    "Blood of the Daedra": "Blood of the Daedra",
+    "Blood of the Divines": "Blood of the Divines",
+    "Blood of the Divines: Free Spirit 1": "Blood of the Divines: Free Spirit 1",
+    "Blood of the Divines: Free Spirit 2": "Blood of the Divines: Free Spirit 2",
+    "Blood of the Divines: Free Spirit 3": "Blood of the Divines: Free Spirit 3",
+    "Blood of the Divines: Free Spirit 4": "Blood of the Divines: Free Spirit 4",
+    "Blood of the Divines: Armor of Tiber Septim": "Blood of the Divines: Armor of Tiber Septim",
+    "Bruma Gate": "Bruma Gate",
+    "Miscarcand": "Miscarcand",
+    "Miscarcand: Great Welkynd Stone": "Miscarcand: Great Welkynd Stone",
+    "Defense of Bruma": "Defense of Bruma",
+    "Great Gate": "Great Gate",
+    "Paradise": "Paradise",
+    "Paradise: Bands of the Chosen Acquired": "Paradise: Bands of the Chosen Acquired",
+    "Paradise: Bands of the Chosen Removed": "Paradise: Bands of the Chosen Removed",
+    "Attack on Fort Sutch": "Attack on Fort Sutch",
+    "Weynon Priory Quest Complete": "Weynon Priory Quest Complete",
+    "Paradise Complete": "Paradise Complete",
+    "Light the Dragonfires": "Light the Dragonfires",
+}
+
+
 class OblivionClientCommandProcessor(ClientCommandProcessor):
     @mark_raw
     def _cmd_set_save_path(self, path: str = ""):
@@ -1398,6 +1507,40 @@ class OblivionClientCommandProcessor(ClientCommandProcessor):
         self.output(f"- Items received: {len(self.ctx.items_received)}")
         self.output(f"- Locations checked: {len(self.ctx.checked_locations)}")
         self.output(f"- Missing locations: {len(self.ctx.missing_locations)}")
+        if not self.ctx.mod_online:
+            self.output(f"- Mod offline: {len(self.ctx.offline_item_events)} item events buffered")
+        if self.ctx.pending_checks:
+            self.output(f"- Checks awaiting server confirmation: {len(self.ctx.pending_checks)}")
+        if self.ctx.completion_watcher:
+            self.output(f"- Bridge watcher: {self.ctx.completion_watcher.backend} ({self.ctx.completion_watcher.wakeups} wakeups)")
+        if self.ctx.bridge_transport:
+            self.output(f"- Bridge transport: {self.ctx.bridge_transport.name}")
+        if self.ctx.item_event_ring:
+            ring = self.ctx.item_event_ring
+            self.output(f"- Item event ring: {min(ring.head, ring.capacity)}/{ring.capacity} slots, "
+                        f"{ring.head} events, {ring.rewrites} rewrites")
+        if self.ctx.bridge_socket:
+            socket_bridge = self.ctx.bridge_socket
+            state = "mod connected" if socket_bridge.transport.connected else "waiting for the mod"
+            self.output(f"- Socket bridge: {socket_bridge.address} ({state}, {socket_bridge.connections} connections)")
+        if self.ctx.deathlink_enabled:
+            deathlink = self.ctx.deathlink
+            self.output(f"- DeathLink: {deathlink.received} received in {deathlink.signals} signals "
+                        f"({deathlink.merged} merged, {deathlink.dropped} dropped, {len(deathlink.queue)} queued), "
+                        f"{deathlink.sent} sent ({deathlink.suppressed} suppressed)")
+        delivery = self.ctx.item_delivery
+        self.output(f"- Item deliveries: {delivery.runs} runs for {delivery.triggers} triggers "
+                    f"({delivery.coalesced} coalesced)")
+        writer = self.ctx.bridge_writer
+        self.output(f"- Bridge writes: {writer.pending_chunks} queued in {writer.pending_files} files "
+                    f"(peak {writer.peak_pending_chunks}), {writer.appends} appends in {writer.file_writes} writes")
+        bridge_io = self.ctx.bridge_io
+        self.output(f"- Bridge I/O thread: {bridge_io.jobs} jobs, {bridge_io.busy_time * 1000:.0f} ms busy "
+                    f"(slowest {bridge_io.peak_busy * 1000:.0f} ms, peak queue {bridge_io.peak_queued})")
+        lag = self.ctx.loop_lag
+        if lag.samples:
+            self.output(f"- Event loop lag: {lag.recent_mean * 1000:.1f} ms avg, {lag.recent_max * 1000:.1f} ms max "
+                        f"recently ({lag.max_lag * 1000:.1f} ms max overall)")
         
         # Display essential world information if available
         if hasattr(self.ctx, 'slot_data') and self.ctx.slot_data:
@@ -1507,17 +1650,53 @@ class OblivionClientCommandProcessor(ClientCommandProcessor):
                 self.output(f"Gate Vision: {gate_vision.title()}")
 
 
+    def _cmd_sessions(self, action: str = ""):
+        """Show disk usage of session files. `/sessions clean` applies the retention limit now."""
+        ctx = self.ctx
+        if action == "clean":
+            if ctx.session_retention is None:
+                self.output("Session cleanup is disabled (--keep-sessions -1).")
+                return True
+            ctx.bridge_io.submit(ctx._collect_old_sessions, ctx.file_prefix, True)
+            return True
+        elif action:
+            self.output("Usage: /sessions [clean]")
+            return True
+
+        sessions = index_sessions(ctx.oblivion_save_path)
+        self.output(f"Sessions in {ctx.oblivion_save_path}:")
+        for session in sessions:
+            marker = " (active)" if session.prefix == ctx.file_prefix else ""
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(session.last_modified))
+            self.output(f"- {session.prefix}{marker}: {len(session.files)} files, "
+                        f"{format_size(session.size)}, last used {last_used}")
+        self.output(f"Total: {len(sessions)} sessions, {format_size(sum(session.size for session in sessions))}; "
+                    f"archived: {format_size(archive_usage(ctx.oblivion_save_path))}")
+        if ctx.session_retention is not None:
+            self.output(f"Keeping the active session and the {ctx.session_retention} most recent "
+                        f"({'archiving' if ctx.archive_sessions else 'deleting'} older ones)")
+        return True
+
+
 class OblivionContext(CommonContext):
     command_processor = OblivionClientCommandProcessor
     game = "Oblivion Remastered"
     items_handling = 0b111
     base_title = "Archipelago Oblivion Client"
     
-    def __init__(self, server_address, password):
+    def __init__(self, server_address, password, save_path: Optional[str] = None,
+                 bridge_io: Optional[BridgeIO] = None):
         super().__init__(server_address, password)
+        # Daemon mode: there is no console to prompt for a missing password
+        self.headless = False
         
         # File system paths
-        if platform.system() == "Windows":
+        self._path_detection_message = ""
+        self._path_override_message = ""
+        if save_path:
+            # Given explicitly (daemon mode): no detection and no override file
+            self.oblivion_save_path = save_path
+        elif platform.system() == "Windows":
             default_path = os.path.join(
                 os.environ.get("USERPROFILE", ""), 
                 "Documents", "My Games", "Oblivion Remastered", "Saved", "Archipelago"
@@ -1535,8 +1714,7 @@ class OblivionContext(CommonContext):
             self.oblivion_save_path = default_path
         
         # Check for path override file in the default location
-        new_path, status = _load_path_override(default_path)
-        self._path_override_message = ""
+        new_path, status = _load_path_override(default_path) if not save_path else (None, "")
         if status:
             (logger.warning if "Error" in status or "Invalid" in status else logger.info)(status)
             if "loaded" in status.lower():
@@ -1544,181 +1722,83 @@ class OblivionContext(CommonContext):
                 self._path_override_message = status
         
         # Completion token mapping: mod token -> location name
-        self.completion_tokens = {
-            "APAzuraCompletionToken": "Azura Quest Complete",
-            "APBoethiaCompletionToken": "Boethia Quest Complete", 
-            "APClavicusVileCompletionToken": "Clavicus Vile Quest Complete",
-            "APHermaeusMoraCompletionToken": "Hermaeus Mora Quest Complete",
-            "APHircineCompletionToken": "Hircine Quest Complete",
-            "APMalacathCompletionToken": "Malacath Quest Complete",
-            "APMephalaCompletionToken": "Mephala Quest Complete",
-            "APMeridiaCompletionToken": "Meridia Quest Complete",
-            "APMolagBalCompletionToken": "Molag Bal Quest Complete",
-            "APNamiraCompletionToken": "Namira Quest Complete",
-            "APNocturnalCompletionToken": "Nocturnal Quest Complete",
-            "APPeryiteCompletionToken": "Peryite Quest Complete",
-            "APSanguineCompletionToken": "Sanguine Quest Complete",
-            "APSheogorathCompletionToken": "Sheogorath Quest Complete", 
-            "APVaerminaCompletionToken": "Vaermina Quest Complete",
-            # Arena checks
-            "APArenaMatch1Victory": "Arena Match 1 Victory",
-            "APArenaMatch2Victory": "Arena Match 2 Victory",
-            "APArenaMatch3Victory": "Arena Match 3 Victory",
-            "APArenaMatch4Victory": "Arena Match 4 Victory",
-            "APArenaMatch5Victory": "Arena Match 5 Victory",
-            "APArenaMatch6Victory": "Arena Match 6 Victory",
-            "APArenaMatch7Victory": "Arena Match 7 Victory",
-            "APArenaMatch8Victory": "Arena Match 8 Victory",
-            "APArenaMatch9Victory": "Arena Match 9 Victory",
-            "APArenaMatch10Victory": "Arena Match 10 Victory",
-            "APArenaMatch11Victory": "Arena Match 11 Victory",
-            "APArenaMatch12Victory": "Arena Match 12 Victory",
-            "APArenaMatch13Victory": "Arena Match 13 Victory",
-            "APArenaMatch14Victory": "Arena Match 14 Victory",
-            "APArenaMatch15Victory": "Arena Match 15 Victory",
-            "APArenaMatch16Victory": "Arena Match 16 Victory",
-            "APArenaMatch17Victory": "Arena Match 17 Victory",
-            "APArenaMatch18Victory": "Arena Match 18 Victory",
-            "APArenaMatch19Victory": "Arena Match 19 Victory",
-            "APArenaMatch20Victory": "Arena Match 20 Victory",
-            "APArenaMatch21Victory": "Arena Match 21 Victory",
-            # Progressive Shop Stock checks (mod tokens stay same, only Python mapping changes)
-            "APShopTokenValue1CompletionToken": "Innkeeper Shop Item Value 1",
-            "APShopTokenValue10CompletionToken": "Innkeeper Shop Item Value 10", 
-            "APShopTokenValue100CompletionToken": "Innkeeper Shop Item Value 100",
-            "APShopTokenValue2CompletionToken": "Innkeeper Shop Item Value 2",
-            "APShopTokenValue20CompletionToken": "Innkeeper Shop Item Value 20",
-            "APShopTokenValue200CompletionToken": "Innkeeper Shop Item Value 200",
-            "APShopTokenValue3CompletionToken": "Innkeeper Shop Item Value 3",
-            "APShopTokenValue30CompletionToken": "Innkeeper Shop Item Value 30",
-            "APShopTokenValue300CompletionToken": "Innkeeper Shop Item Value 300",
-            "APShopTokenValue4CompletionToken": "Innkeeper Shop Item Value 4",
-            "APShopTokenValue40CompletionToken": "Innkeeper Shop Item Value 40",
-            "APShopTokenValue400CompletionToken": "Innkeeper Shop Item Value 400",
-            "APShopTokenValue5CompletionToken": "Innkeeper Shop Item Value 5",
-            "APShopTokenValue50CompletionToken": "Innkeeper Shop Item Value 50",
-            "APShopTokenValue500CompletionToken": "Innkeeper Shop Item Value 500",
-            # Main Quest checks
-            "Deliver the Amulet": "Deliver the Amulet",
-            "Breaking the Siege of Kvatch: Gate Closed": "Breaking the Siege of Kvatch: Gate Closed",
-            "Breaking the Siege of Kvatch": "Breaking the Siege of Kvatch",
-            "Find the Heir": "Find the Heir",
-            "Weynon Priory": "Weynon Priory",
-            "Battle for Castle Kvatch": "Battle for Castle Kvatch",
-            # MQ05
-            "The Path of Dawn: Acquire Commentaries Vol I": "The Path of Dawn: Acquire Commentaries Vol I",
-            "The Path of Dawn: Acquire Commentaries Vol II": "The Path of Dawn: Acquire Commentaries Vol II",
-            "The Path of Dawn: Acquire Commentaries Vol III": "The Path of Dawn: Acquire Commentaries Vol III",
-            "The Path of Dawn: Acquire Commentaries Vol IV": "The Path of Dawn: Acquire Commentaries Vol IV",
-            "The Path of Dawn": "The Path of Dawn",
-            # MQ06
-            "Dagon Shrine: Mysterium Xarxes Acquired": "Dagon Shrine: Mysterium Xarxes Acquired",
-            "Dagon Shrine: Kill Harrow": "Dagon Shrine: Kill Harrow",
-            "Dagon Shrine": "Dagon Shrine",
-            # MQ07 Spies
-            "Spies: Kill Saveri Faram": "Spies: Kill Saveri Faram",
-            "Spies: Kill Jearl": "Spies: Kill Jearl",
-            "Spies": "Spies",
-            # MQ07+ and event/milestone completions
-            "Blood of the Daedra": "Blood of the Daedra",
-            "Blood of the Divines": "Blood of the Divines",
-            "Blood of the Divines: Free Spirit 1": "Blood of the Divines: Free Spirit 1",
-            "Blood of the Divines: Free Spirit 2": "Blood of the Divines: Free Spirit 2",
-            "Blood of the Divines: Free Spirit 3": "Blood of the Divines: Free Spirit 3",
-            "Blood of the Divines: Free Spirit 4": "Blood of the Divines: Free Spirit 4",
-            "Blood of the Divines: Armor of Tiber Septim": "Blood of the Divines: Armor of Tiber Septim",
-            "Bruma Gate": "Bruma Gate",
-            "Miscarcand": "Miscarcand",
-            "Miscarcand: Great Welkynd Stone": "Miscarcand: Great Welkynd Stone",
-            "Defense of Bruma": "Defense of Bruma",
-            "Great Gate": "Great Gate",
-            "Paradise": "Paradise",
-            "Paradise: Bands of the Chosen Acquired": "Paradise: Bands of the Chosen Acquired",
-            "Paradise: Bands of the Chosen Removed": "Paradise: Bands of the Chosen Removed",
-            "Attack on Fort Sutch": "Attack on Fort Sutch",
-            "Weynon Priory Quest Complete": "Weynon Priory Quest Complete",
-            "Paradise Complete": "Paradise Complete",
-            "Light the Dragonfires": "Light the Dragonfires",
-        }
+        self.completion_tokens = COMPLETION_TOKENS
         
         # State tracking
-        self.last_completion_check = 0
+        self.bridge_transport: Optional[BridgeTransport] = None
+        # Journal transport for a mod that announced the protocol (probed and opened off the
+        # loop, re-probed only when the watcher reports a change to <prefix>_from_mod.journal)
+        self.mod_journal: Optional[JournalTransport] = None
+        # Blocking bridge file I/O runs on its own thread; the lag monitor shows what the loop sees
+        self.bridge_io = bridge_io or BridgeIO()
+        # A BridgeIO passed in (daemon mode) is shared between slots and closed by its owner
+        self.owns_bridge_io = bridge_io is None
+        self.loop_lag = LoopLagMonitor()
+        # Mod liveness: while it is offline, deliveries wait and item events are buffered
+        self.mod_heartbeat: Optional[ModHeartbeat] = None
+        self.item_event_ring: Optional[ItemEventRing] = None
+        self.mod_online = True
+        self.offline_item_events = deque(maxlen=MAX_OFFLINE_ITEM_EVENTS)
+        # Optional loopback socket bridge ("tcp"/"unix", set from --bridge-socket)
+        self.bridge_socket_kind: Optional[str] = None
+        self.bridge_socket: Optional[SocketBridgeServer] = None
+        # Appends to the bridge files are coalesced and written behind
+        self.bridge_writer = WriteBehindWriter(io=self.bridge_io)
+        # Old session files kept besides the active session (None: never clean up)
+        self.session_retention: Optional[int] = DEFAULT_SESSION_RETENTION
+        self.archive_sessions = True
+        self.completion_router: Optional[CompletionRouter] = None
+        self._completion_handlers = {
+            Completions.LOCATION: self._on_completed_location,
+            Completions.GATE: self._on_gate_closed,
+            Completions.SKILL: self._on_skill_increase,
+            Completions.DUNGEON: self._on_dungeon_cleared,
+            Completions.VICTORY: self._on_victory,
+            Completions.DEATHLINK: self._on_deathlink_completion,
+            Completions.NIRNROOT: self._on_nirnroot_harvested,
+            Completions.KILL: self._on_kill,
+            Completions.GOLD: self._on_gold_collected,
+            Completions.DOOMSTONE: self._on_doomstone_visited,
+            Completions.IGNORE: self._on_ignored_completion,
+            Completions.UNKNOWN: self._on_unknown_completion,
+        }
         self.file_prefix = ""
+        # Slot name the file prefix was set up for
+        self.prefix_auth = ""
         self.session_id = ""
+        # Session whose connection setup completed; a Connected for it takes the fast path
+        self.prepared_session_id = ""
+        self.fast_reconnect = False
         self.game_loop_task = None
+        self.completion_watcher: FileWatcher = None
         self.bridge_processed_items = {}
+        self.bridge_status_reader: Optional[BridgeStatusReader] = None
         self.victory_sent = False
+        # The mod reported victory; the StatusUpdate goes out (again) whenever it could not be sent
+        self.goal_reached = False
         self.regions_completed_sent = set()
         
         # Deathlink state
         self.deathlink_enabled = False
-        self.deathlink_pending = False
-        self.last_death_sent = 0
+        # Incoming deaths are coalesced into one mod signal; outgoing ones are rate limited
+        self.deathlink = DeathLinkPipeline(self._send_deathlink_to_mod, self.send_death)
 
         # Trap state: track which indices in items_received have already been
         # written to _traps.txt so we never fire the same trap twice.
         self.sent_trap_indices: Set[int] = set()
+        # Fired since the journal was last appended to
+        self.unsaved_trap_indices: List[int] = []
+
+        # Delivery cursor: number of items_received entries already handed to the mod.
+        # None until loaded for the current session (falls back to a full reconcile).
+        self.delivery_cursor: Optional[int] = None
+        self.progressive_received_counts: Counter = Counter()
+        # ReceivedItems bursts collapse into one delivery run plus at most one rerun
+        self.item_delivery = SingleFlight(self._send_items_to_oblivion, "item delivery")
 
         
-        # Progressive item tracking
-        self.progressive_states = {
-            "Progressive Arena Rank": 0,
-            "Progressive Shop Stock": 0,
-            "Progressive Armor Set": 0,
-            "Progressive Nirnroot Satchel": 0,
-            "Progressive Septim Satchel": 0,
-            **{f"Progressive {class_name} Level": 0
-               for class_name in [
-                   "Acrobat", "Agent", "Archer", "Assassin", "Barbarian", "Bard", "Battlemage",
-                   "Crusader", "Healer", "Knight", "Mage", "Monk", "Nightblade", "Pilgrim",
-                   "Rogue", "Scout", "Sorcerer", "Spellsword", "Thief", "Warrior", "Witchhunter"
-               ]}
-        }
-        
-        # Progressive item lookup tables
-        self.progressive_lookups = {
-            "Progressive Arena Rank": [
-                "APArenaPitDogUnlock",
-                "APArenaBrawlerUnlock", 
-                "APArenaBloodletterUnlock",
-                "APArenaMyrmidonUnlock",
-                "APArenaWarriorUnlock",
-                "APArenaGladiatorUnlock",
-                "APArenaHeroUnlock"
-            ],
-            "Progressive Shop Stock": [
-                ["APShopCheckValue2", "APShopCheckValue20", "APShopCheckValue200"],   # Set 2
-                ["APShopCheckValue3", "APShopCheckValue30", "APShopCheckValue300"],   # Set 3
-                ["APShopCheckValue4", "APShopCheckValue40", "APShopCheckValue400"],   # Set 4
-                ["APShopCheckValue5", "APShopCheckValue50", "APShopCheckValue500"]    # Set 5
-            ],
-            "Progressive Armor Set": [
-                ["APArmorTier2"],   # Tier 2 (Chainmail/Dwarven) - 1st Progressive Armor Set (early placement)
-                ["APArmorTier4"],   # Tier 4 (Elven/Ebony) - 2nd Progressive Armor Set
-                ["APArmorTier5"]    # Tier 5 (Glass/Daedric) - 3rd Progressive Armor Set
-            ],
-            "Progressive Nirnroot Satchel": [
-                "APNirnrootSatchel1",  # Capacity 5
-                "APNirnrootSatchel2",  # Capacity 15
-                "APNirnrootSatchel3",  # Capacity 30
-                "APNirnrootSatchel4",  # Capacity 50
-                "APNirnrootSatchel5"   # Capacity 100
-            ],
-            "Progressive Septim Satchel": [
-                "APSeptimSatchel1",  # Capacity 2500
-                "APSeptimSatchel2",  # Capacity 5000
-                "APSeptimSatchel3",  # Capacity 10000
-                "APSeptimSatchel4",  # Capacity 25000
-                "APSeptimSatchel5"   # Capacity Unlimited
-            ],
-            # Progressive Class Level items
-            **{f"Progressive {class_name} Level": [f"APClassLevel{i}" for i in range(1, 21)]
-             for class_name in [
-                "Acrobat", "Agent", "Archer", "Assassin", "Barbarian", "Bard", "Battlemage",
-                "Crusader", "Healer", "Knight", "Mage", "Monk", "Nightblade", "Pilgrim",
-                "Rogue", "Scout", "Sorcerer", "Spellsword", "Thief", "Warrior", "Witchhunter"
-             ]}
-    }
+        # Progressive item tracking (level tokens come from the Progressive expansion tables)
+        self.progressive_states = dict.fromkeys(PROGRESSIVE_LEVELS, 0)
         
         # Ensure save directory exists
         try:
@@ -1729,9 +1809,19 @@ class OblivionContext(CommonContext):
         # Initialize tracker
         self.tracker_enabled = True
         self.tracker = None  # Will be initialized after connection
+        # Per-session client state (progressive levels, cursor, traps, scouts, pending checks)
+        self.state_store = None
+        # Completed location ids awaiting server confirmation -> time last sent (0 = not yet sent)
+        self.pending_checks: Dict[int, float] = {}
         
     async def server_auth(self, password_requested: bool = False):
         if password_requested and not self.password:
+            if self.headless:
+                logger.error(f"{self.server_address} requires a password; add it to the slot in the daemon config")
+                self.server_address = None
+                self.exit_event.set()
+                await self.disconnect()
+                return
             await super().server_auth(password_requested)
         await self.get_username()
         await self.send_connect()
@@ -1740,8 +1830,7 @@ class OblivionContext(CommonContext):
         """Handle incoming deathlink from another player."""
         try:
             super().on_deathlink(data)
-            self.deathlink_pending = True
-            asyncio.create_task(self._send_deathlink_to_mod())
+            self.deathlink.receive(data.get("source", "unknown"), data.get("cause"))
         except Exception as e:
             logger.error(f"[DeathLink] Error in on_deathlink: {e}", exc_info=True)
     
@@ -1749,18 +1838,35 @@ class OblivionContext(CommonContext):
         """Handle incoming server packages."""
         if cmd == "Connected":
             self.slot_data = args.get("slot_data", {})
-            self.session_id = self.slot_data.get("session_id") or ""
-
-            # Set up file prefix
+            session_id = self.slot_data.get("session_id") or ""
             auth_name = getattr(self, 'auth', None) or getattr(self, 'player_name', None) or getattr(self, 'name', None)
-            if auth_name:
-                self.auth = auth_name
-                self._setup_file_prefix()
+            # Reconnecting (e.g. autoreconnect) to the session we are already set up for:
+            # keep the in-memory state and only resync what changed
+            self.fast_reconnect = bool(session_id) and session_id == self.prepared_session_id \
+                and auth_name == self.prefix_auth and bool(self.file_prefix)
+            self.session_id = session_id
+            # Everything the server already has is no longer pending
+            self._confirm_checks(args.get("checked_locations", ()))
+            if not self.fast_reconnect:
+                # Deaths queued for another session must not kill the player in this one
+                self.deathlink.cancel()
+                # Reload the delivery cursor for this session on the next delivery
+                self.delivery_cursor = None
+                # Completion routes depend on slot_data; rebuild for this connection
+                self.completion_router = None
+
+                # Set up file prefix
+                if auth_name:
+                    self.auth = auth_name
+                    self._setup_file_prefix()
             
             # Add selected progressive class level item to states
             progressive_class_level_item_name = self.slot_data.get("progressive_class_level_item_name")
             if progressive_class_level_item_name:
-                self.progressive_states[progressive_class_level_item_name] = 0
+                if self.fast_reconnect:
+                    self.progressive_states.setdefault(progressive_class_level_item_name, 0)
+                else:
+                    self.progressive_states[progressive_class_level_item_name] = 0
             
             # Enable deathlink if option is set
             if self.slot_data.get("death_link", False):
@@ -1773,8 +1879,10 @@ class OblivionContext(CommonContext):
                 if old_tags != self.tags and self.server and not self.server.socket.closed:
                     asyncio.create_task(self.send_msgs([{"cmd": "ConnectUpdate", "tags": self.tags}]))
             
-            # Initialize tracker after slot_data is available
-            self.tracker = OblivionTracker(self)
+            # Initialize tracker after slot_data is available (kept with its caches on a fast reconnect)
+            if not (self.fast_reconnect and self.tracker):
+                self.tracker = OblivionTracker(self)
+                self._restore_shop_scouts()
             
             asyncio.create_task(self._setup_after_connection())
             # Initial shop tier (tier 1) scout scheduling
@@ -1790,7 +1898,7 @@ class OblivionContext(CommonContext):
                 logger.info(self._path_override_message)
             
             # Display path detection message if Linux
-            if hasattr(self, '_path_detection_message'):
+            if self._path_detection_message:
                 logger.info(self._path_detection_message)
 
             # Check that we can actually write to the save directory
@@ -1805,7 +1913,7 @@ class OblivionContext(CommonContext):
                 logger.error(f"[Oblivion] Error: {e}")
                 logger.error("[Oblivion] The mod will not receive items. Try running as Administrator or use /set_save_path to choose a different location.")
         elif cmd == "ReceivedItems":
-            asyncio.create_task(self._send_items_to_oblivion())
+            self.item_delivery.trigger()
             # Update tracker with new items
             if self.tracker:
                 self.tracker.refresh_items()
@@ -1839,6 +1947,8 @@ class OblivionContext(CommonContext):
                         "receiving_player": receiving_player,
                         "flags": flags
                     }
+                self._persist_shop_scouts({loc_id: self.tracker.shop_cache[loc_id]
+                                           for loc_id in self.tracker.shop_cache})
                 # Mark initialization as done and update display
                 self.tracker._shop_init_done = True
                 self.tracker.update_shop_tab()
@@ -1846,6 +1956,7 @@ class OblivionContext(CommonContext):
             if "checked_locations" in args:
                 # Sync checked_locations and missing_locations with server
                 new_checked = set(args["checked_locations"])
+                self._confirm_checks(new_checked)
                 if hasattr(self, 'checked_locations'):
                     self.checked_locations |= new_checked
                 else:
@@ -1859,6 +1970,9 @@ class OblivionContext(CommonContext):
                 # Remove any we already have marked as checked (safety)
                 if hasattr(self, 'checked_locations'):
                     self.missing_locations -= self.checked_locations
+                # Reposition the per-family cursors on the new set
+                if self.completion_router:
+                    self.completion_router.seed(self.missing_locations, self.pending_checks)
             # After updating sets, refresh tracker state
             if self.tracker:
                 self.tracker.update_locations()
@@ -1895,6 +2009,7 @@ class OblivionContext(CommonContext):
                                                            "player": hint.get("finding_player"),
                                                            "receiving_player": hint.get("receiving_player"),
                                                            "flags": hint.get("item_flags", 0)}
+                        self._persist_shop_scouts({loc_id: self.tracker.shop_cache[loc_id]})
                         self.tracker._shop_init_done = True
                         if hasattr(self, 'tab_shop'):
                             self.tracker.update_shop_tab()
@@ -1960,19 +2075,21 @@ class OblivionContext(CommonContext):
         if not self.file_prefix:
             return
             
-        transfer_file = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_item_events.txt")
+        if transfer_info["direction"] == "found":
+            # Found items include location
+            line = f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['location']}"
+        elif 'location' in transfer_info and transfer_info['location']:
+            # Sent/received items
+            line = f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['other_player']}|{transfer_info['location']}"
+        else:
+            line = f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['other_player']}"
         
+        if not self._mod_online():
+            # Written in one batch when the mod comes back
+            self.offline_item_events.append(line)
+            return
         try:
-            with open(transfer_file, "a") as f:
-                if transfer_info["direction"] == "found":
-                    # Found items include location
-                    f.write(f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['location']}\n")
-                else:
-                    # Sent/received items
-                    if 'location' in transfer_info and transfer_info['location']:
-                        f.write(f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['other_player']}|{transfer_info['location']}\n")
-                    else:
-                        f.write(f"{transfer_info['direction']}|{transfer_info['item']}|{transfer_info['other_player']}\n")
+            self._ensure_bridge_transport().send_item_event(line)
         except Exception as e:
             logger.error(f"Error writing transfer log: {e}")
     
@@ -1999,24 +2116,75 @@ class OblivionContext(CommonContext):
         if not self.file_prefix or not self.session_id:
             logger.error("File prefix or session_id not set during connection")
             return
+
+        if self.fast_reconnect:
+            await self._resume_after_reconnect()
+            return
             
-        self._load_progressive_states()
+        await self._load_progressive_states()
+        await self._probe_mod_journal()
+        await self._refresh_mod_heartbeat()
             
-        self._check_existing_items_file()
+        await self.bridge_io.run(self._check_existing_items_file)
+        await self._start_bridge_socket()
         
         # Write game configuration files
-        self._write_settings_file()
-        self._write_connection_info()
+        await self.bridge_io.run(self._write_settings_file)
+        await self.bridge_io.run(self._write_connection_info)
         logger.info(f"Connected as {self.auth} with session {self.session_id[:8]}")
         
         # Wait for connection data to be fully populated
         await self._wait_for_connection_data()
+
+        # Checks completed while offline (or before a restart) go out in one batch
+        await self._flush_pending_checks(resend=True)
+        await self._send_goal()
         
         # Check for any existing completion files
-        await self._check_for_locations(force_check=True)
+        await self._check_for_locations()
         
         # Start the file monitoring loop
         self._start_game_loop()
+        self.prepared_session_id = self.session_id
+        self.bridge_io.submit(self._collect_old_sessions, self.file_prefix)
+
+    def _collect_old_sessions(self, active_prefix: Optional[str], report: bool = False):
+        """Archive or delete files of sessions beyond the retention limit (runs on the I/O thread)."""
+        if self.session_retention is None or self.session_retention < 0:
+            return
+        try:
+            removed = collect_sessions(self.oblivion_save_path, self.session_retention,
+                                       [active_prefix] if active_prefix else [], archive=self.archive_sessions)
+        except Exception as e:
+            logger.error(f"[Sessions] Cleanup failed: {e}")
+            return
+        if removed or report:
+            size = format_size(sum(session.size for session in removed))
+            action = "Archived" if self.archive_sessions else "Deleted"
+            logger.info(f"[Sessions] {action} {len(removed)} old sessions ({size})")
+
+    async def _resume_after_reconnect(self):
+        """Fast path for a reconnect to the session already set up.
+
+        Progressive levels, the delivery cursor, trap indices and the tracker are still in
+        memory and the settings file is unchanged, so nothing is reloaded or rewritten. Items
+        are resynced by the ReceivedItems delivery, which only sends what lies past the
+        delivery cursor.
+        """
+        started = time.perf_counter()
+        # The connection file may have been removed while we were offline
+        await self.bridge_io.run(self._write_connection_info)
+        if self.completion_router is not None and self.missing_locations:
+            # Checks may have been collected on the server while we were away
+            self.completion_router.seed(self.missing_locations, self.pending_checks)
+        await self._flush_pending_checks(resend=True)
+        await self._send_goal()
+        self._start_game_loop()
+        if self.completion_watcher:
+            # Pick up completions the mod wrote while we were disconnected
+            self.completion_watcher.notify()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Reconnected as {self.auth} to session {self.session_id[:8]} ({elapsed_ms:.0f} ms resync)")
             
     def _setup_file_prefix(self):
         """Setup file prefix based on player name and session ID."""
@@ -2024,78 +2192,173 @@ class OblivionContext(CommonContext):
         safe_auth = get_file_safe_name(self.auth)
         session_short = self.session_id[:8] if self.session_id else "nosession"
         self.file_prefix = f"AP_{safe_auth}_{session_short}"
+        self.prefix_auth = self.auth
+        # The state store is only used from the I/O thread. The Connected handler needs the
+        # session state right away, so this one-time load is waited for.
+        self.bridge_io.submit(self._load_session_state).result()
+
+    def _load_session_state(self):
+        """Open the session's state store and load it (on the I/O thread)."""
+        # Resuming a seed whose files were archived: bring its state back before reading it
+        restored = restore_session(self.oblivion_save_path, self.file_prefix)
+        if restored:
+            logger.info(f"[Sessions] Restored {restored} archived files for {self.file_prefix}")
+        self._open_state_store()
         self._load_sent_trap_indices()
+        self._load_pending_checks()
+        self._load_goal_state()
 
-    def _load_sent_trap_indices(self):
-        if not self.file_prefix:
+    def _open_state_store(self):
+        """Open the state store for the current session (once per session)."""
+        if self.state_store is not None:
+            if getattr(self, "_state_store_prefix", None) == self.file_prefix:
+                return
+            self.state_store.close()
+            self.state_store = None
+        try:
+            self.state_store = open_state_store(self.oblivion_save_path, self.file_prefix)
+            self._state_store_prefix = self.file_prefix
+        except Exception as e:
+            logger.error(f"[State] Could not open session state: {e}")
+
+    def _load_pending_checks(self):
+        self.pending_checks = {}
+        if self.state_store is None:
             return
-        path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_traps_sent.txt")
-        if not os.path.exists(path):
+        try:
+            self.pending_checks = dict.fromkeys(self.state_store.pending_checks(), 0.0)
+        except Exception as e:
+            logger.error(f"Error loading pending checks: {e}")
+
+    def _load_goal_state(self):
+        self.victory_sent = False
+        self.goal_reached = False
+        if self.state_store is None:
             return
         try:
-            with open(path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line.isdigit():
-                        self.sent_trap_indices.add(int(line))
+            self.goal_reached = self.state_store.get("goal_reached") == "1"
         except Exception as e:
-            logger.error(f"Error loading trap sent indices: {e}")
+            logger.error(f"Error loading goal state: {e}")
 
-    def _save_sent_trap_indices(self):
-        if not self.file_prefix:
+    async def _send_goal(self):
+        """Report the goal to the server once connected (the mod may report it while we are offline)."""
+        if not self.goal_reached or self.victory_sent or not self._server_connected():
             return
-        path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_traps_sent.txt")
+        await self.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
+        self.victory_sent = True
+
+    def _server_connected(self) -> bool:
+        return bool(self.server and self.server.socket and not self.server.socket.closed)
+
+    def _store_update(self, method: str, *args):
+        """Apply a state store update on the I/O thread, in order with the bridge I/O queued before it."""
+        if self.state_store is not None:
+            self.bridge_io.submit(self._apply_store_update, self.state_store, method, args)
+
+    @staticmethod
+    def _apply_store_update(store, method: str, args: tuple):
         try:
-            with open(path, "w") as f:
-                for idx in sorted(self.sent_trap_indices):
-                    f.write(f"{idx}\n")
+            getattr(store, method)(*args)
         except Exception as e:
-            logger.error(f"Error saving trap sent indices: {e}")
-    
-    def _load_progressive_states(self):
-        """Load progressive item states from file."""
-        if not self.file_prefix:
+            logger.error(f"[State] Could not save session state ({method}): {e}")
+
+    def _queue_pending_checks(self, location_ids: List[int]):
+        """Journal completed locations so they survive a dropped connection or a restart."""
+        new_ids = [location_id for location_id in location_ids if location_id not in self.pending_checks]
+        if not new_ids:
             return
-            
-        progressive_file = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_progression_levels.txt")
-        
-        if not os.path.exists(progressive_file):
+        for location_id in new_ids:
+            self.pending_checks[location_id] = 0.0
+        self._store_update("add_pending_checks", new_ids)
+
+    def _confirm_checks(self, location_ids):
+        """Drop checks the server has confirmed from the pending journal."""
+        confirmed = [location_id for location_id in location_ids if location_id in self.pending_checks]
+        if not confirmed:
+            return
+        for location_id in confirmed:
+            del self.pending_checks[location_id]
+        self._store_update("remove_pending_checks", confirmed)
+
+    async def _flush_pending_checks(self, resend: bool = False) -> Set[int]:
+        """Send pending checks in one LocationChecks batch while connected.
+
+        Checks stay journaled until RoomUpdate.checked_locations confirms them; unconfirmed
+        ones are sent again after PENDING_CHECK_RESEND_INTERVAL, or right away with `resend`
+        (after a reconnect).
+        """
+        if not self.pending_checks or not self._server_connected():
+            return set()
+        # Checked in the meantime (e.g. collected on the server): nothing left to send
+        self._confirm_checks([location_id for location_id in self.pending_checks
+                              if location_id not in self.missing_locations])
+        now = time.monotonic()
+        due = [location_id for location_id, sent_at in self.pending_checks.items()
+               if resend or now - sent_at >= PENDING_CHECK_RESEND_INTERVAL]
+        if not due:
+            return set()
+        found_locations = await self.check_locations(due)
+        for location_id in due:
+            self.pending_checks[location_id] = now
+        return found_locations
+
+    def _restore_shop_scouts(self):
+        """Seed the tracker with shop scouts from earlier connections so they are not re-sent."""
+        if self.state_store is None or not self.tracker:
             return
-            
         try:
-            with open(progressive_file, "r") as f:
-                for line in f:
-                    if "=" in line:
-                        item_type, count_str = line.strip().split("=", 1)
-                        if item_type in self.progressive_states:
-                            self.progressive_states[item_type] = int(count_str)
+            # Waited for like the rest of the session load, the tracker is seeded right after
+            scouts = self.bridge_io.submit(self.state_store.shop_scouts).result()
         except Exception as e:
-            # Reset to defaults on error
-            self.progressive_states = {
-                "Progressive Arena Rank": 0,
-                "Progressive Shop Stock": 0,
-                "Progressive Armor Set": 0,
-                **{f"Progressive {class_name} Level": 0
-                   for class_name in [
-                       "Acrobat", "Agent", "Archer", "Assassin", "Barbarian", "Bard", "Battlemage",
-                       "Crusader", "Healer", "Knight", "Mage", "Monk", "Nightblade", "Pilgrim",
-                       "Rogue", "Scout", "Sorcerer", "Spellsword", "Thief", "Warrior", "Witchhunter"
-                   ]}
-            }
+            logger.error(f"Error loading shop scouts: {e}")
+            return
+        self.tracker.hinted_shop_location_ids.update(scouts)
+        self.tracker.shop_cache.update({loc_id: entry for loc_id, entry in scouts.items() if entry})
+
+    def _persist_shop_scouts(self, scouts: dict):
+        self._store_update("put_shop_scouts", dict(scouts))
+
+    def _load_sent_trap_indices(self):
+        self.sent_trap_indices = set()
+        self.unsaved_trap_indices = []
+        if self.state_store is None:
+            return
+        try:
+            self.sent_trap_indices = self.state_store.trap_indices()
+        except Exception as e:
+            logger.error(f"Error loading trap sent indices: {e}")
+
+    def _record_sent_traps(self, indices):
+        """Mark trap indices as fired; they are persisted once the traps are on disk."""
+        for idx in indices:
+            self.sent_trap_indices.add(idx)
+            self.unsaved_trap_indices.append(idx)
+        self.bridge_writer.call_after_flush(self._save_sent_trap_indices)
+
+    def _save_sent_trap_indices(self):
+        """Record newly fired trap indices in the state store."""
+        if not self.unsaved_trap_indices:
+            return
+        self._store_update("add_trap_indices", self.unsaved_trap_indices)
+        self.unsaved_trap_indices = []
     
-    def _save_progressive_states(self):
-        """Save progressive item states to file."""
-        if not self.file_prefix:
+    async def _load_progressive_states(self):
+        """Load progressive item states from the state store."""
+        if self.state_store is None:
             return
             
-        progressive_file = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_progression_levels.txt")
-        
         try:
-            with open(progressive_file, "w") as f:
-                for item_type, count in self.progressive_states.items():
-                    f.write(f"{item_type}={count}\n")
+            levels = await self.bridge_io.run(self.state_store.progressive_levels)
+            for item_type, count in levels.items():
+                if item_type in self.progressive_states:
+                    self.progressive_states[item_type] = int(count)
         except Exception as e:
-            logger.error(f"Error saving progressive states: {e}")
+            # Reset to defaults on error
+            self.progressive_states = dict.fromkeys(PROGRESSIVE_LEVELS, 0)
+    
+    def _save_progressive_states(self):
+        """Save progressive item states to the state store."""
+        self._store_update("set_progressive_levels", dict(self.progressive_states))
     
     def _process_progressive_items(self, items):
         """Process a list of items, converting progressive items to queue items."""
@@ -2103,22 +2366,14 @@ class OblivionContext(CommonContext):
         
         for item_name in items:
             if item_name in self.progressive_states:
-                # This is a progressive item
+                # This is a progressive item: add the token(s) of its next level
                 current_level = self.progressive_states[item_name]
-                max_level = len(self.progressive_lookups[item_name])
-                
-                if current_level < max_level:
-                    # Get the item(s) for this progression level
-                    level_items = self.progressive_lookups[item_name][current_level]
-                    
-                    if isinstance(level_items, list):
-                        # Shop Stock - add all 3 items for this set
-                        queue_items.extend(level_items)
-                    else:
-                        # Arena Rank - add single item
-                        queue_items.append(level_items)
+                level_items = expand_progressive(item_name, current_level, current_level + 1)
+                if level_items:
+                    queue_items.extend(level_items)
                 else:
-                    logger.warning(f"Progressive item {item_name} already at max level ({max_level})")
+                    logger.warning(f"Progressive item {item_name} already at max level "
+                                   f"({progressive_max_level(item_name)})")
             else:
                 # Regular item, pass through unchanged
                 queue_items.append(item_name)
@@ -2133,10 +2388,12 @@ class OblivionContext(CommonContext):
             
         try:
             with open(items_file, "r") as f:
-                items = [line.strip() for line in f.readlines() if line.strip()]
+                items = count_queue_lines(line.strip() for line in f if line.strip())
             
             if items:
-                logger.warning(f"{len(items)} items in queue - will be sent when Oblivion starts.")
+                logger.warning(f"{sum(items.values())} items in queue - will be sent when Oblivion starts.")
+                if not self._mod_online():
+                    self._compact_item_queue()
         except Exception as e:
             logger.error(f"Error checking existing items file: {e}")
         
@@ -2149,6 +2406,9 @@ class OblivionContext(CommonContext):
                 f.write(f"session_id={self.session_id}\n")
                 f.write(f"slot_name={self.auth}\n")
                 f.write(f"connected_time={int(time.time())}\n")
+                if self.bridge_socket:
+                    f.write(f"bridge_socket={self.bridge_socket.address}\n")
+                    f.write(f"bridge_token={self.bridge_socket.token}\n")
         except Exception as e:
             logger.error(f"Error writing connection info: {e}")
             
@@ -2199,6 +2459,8 @@ class OblivionContext(CommonContext):
                 f.write(f"active_shrines={','.join(active_shrines)}\n")
                 f.write(f"shrine_count={len(active_shrines)}\n")
                 f.write(f"session_id={self.session_id}\n")  # Include session_id in settings
+                # Highest bridge protocol the client speaks; the mod opts in with a hello frame
+                f.write(f"bridge_protocol={BRIDGE_PROTOCOL_VERSION}\n")
                 
                 # Write goal setting
                 goal = self.slot_data.get("goal")
@@ -2301,6 +2563,12 @@ class OblivionContext(CommonContext):
                     f.write(f"overworld_kills={overworld_kills}\n")
                     f.write(f"dungeon_kills_per_region={self.slot_data.get('dungeon_kills_per_region', dungeon_kills)}\n")
                     f.write(f"overworld_kills_per_region={self.slot_data.get('overworld_kills_per_region', overworld_kills)}\n")
+                # Touch <prefix>_heartbeat.txt this often while the game runs
+                f.write(f"heartbeat_interval={MOD_HEARTBEAT_INTERVAL}\n")
+                # The client accepts counted completion lines ("Dungeon Kill|12", "Nirnroot Harvested|3")
+                f.write("counted_completions=True\n")
+                # Ring size of <prefix>_item_events_ring.txt (used once the mod announces item_event_ring)
+                f.write(f"item_event_ring_capacity={ITEM_EVENT_RING_CAPACITY}\n")
 
                 # Write selected regions and per-region dungeon lists for the mod
                 selected_regions = self.slot_data.get("selected_regions", []) or []
@@ -2339,23 +2607,15 @@ class OblivionContext(CommonContext):
             return
             
         status_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_bridge_status.txt")
-        
-        # Always initialize to empty - will be populated if file has content
-        self.bridge_processed_items = {}
-        
-        if not os.path.exists(status_path):
-            return
+        if self.bridge_status_reader is None or self.bridge_status_reader.path != status_path:
+            self.bridge_status_reader = BridgeStatusReader(status_path)
             
         try:
-            with open(status_path, "r") as f:
-                content = f.read().strip()
-                if content:
-                    processed_items = [item.strip() for item in content.split(",") if item.strip()]
-                    # Count occurrences of each item
-                    for item in processed_items:
-                        self.bridge_processed_items[item] = self.bridge_processed_items.get(item, 0) + 1
+            # Only the tail appended since the last read is parsed
+            self.bridge_processed_items = self.bridge_status_reader.read()
         except Exception as e:
             logger.error(f"Error reading bridge status: {e}")
+            self.bridge_status_reader.reset()
             self.bridge_processed_items = {}
         
     async def _send_items_to_oblivion(self):
@@ -2363,34 +2623,118 @@ class OblivionContext(CommonContext):
         if not self.file_prefix:
             if not self._load_connection_info():
                 return
-        
-        # Read latest bridge status before sending items
-        self._read_bridge_status()
-        
-        # Read what's already in the queue
+
+        if not self._mod_online():
+            # Items stay in items_received past the cursor and go out in one batch later
+            return
+
+        transport = self._ensure_bridge_transport()
+        next_index = await self._transport_io(transport, transport.next_item_index) if transport.resumes_from_ack else 0
+        if next_index > 0:
+            # The mod acknowledges items_received indices: resume right after the last one
+            # applied or already journaled, no read-back of the queue needed. (A journal
+            # without any indexed item yet falls through to the cursor/reconcile path,
+            # which covers whatever was delivered through the text files before.)
+            if next_index != self.delivery_cursor:
+                self.delivery_cursor = next_index
+                self._seed_progressive_received_counts()
+            self._deliver_new_items()
+            return
+
+        if self.delivery_cursor is None:
+            await self._load_delivery_cursor()
+
+        if self.delivery_cursor is None:
+            # First delivery for this session: reconcile against what the mod already has
+            await self.bridge_io.run(self._read_bridge_status)
+            queued_counts = await self.bridge_io.run(self._read_queued_counts)
+            self._reconcile_items_with_bridge(queued_counts)
+        else:
+            self._deliver_new_items()
+
+    def _deliver_new_items(self):
+        """Deliver only the items_received entries past the delivery cursor."""
+        from worlds.oblivion.Items import item_table, item_id_to_name, trap_code_map
+        from BaseClasses import ItemClassification
+
+        end = len(self.items_received)
+        if self.delivery_cursor >= end:
+            return
+
+        queue_items = []
+        pending_traps: List[tuple] = []
+        # (index, trap code or None, item tokens) in items_received order
+        entries: List[tuple] = []
+        for idx in range(self.delivery_cursor, end):
+            item_name = item_id_to_name.get(self.items_received[idx].item)
+            if not item_name:
+                continue
+            # Traps are routed separately, never to _items.txt
+            if item_table[item_name].classification == ItemClassification.trap:
+                if idx not in self.sent_trap_indices:
+                    trap_code = trap_code_map.get(item_name)
+                    if trap_code:
+                        pending_traps.append((idx, trap_code))
+                        entries.append((idx, trap_code, None))
+            elif item_name in self.progressive_states:
+                # The Nth copy of a progressive item unlocks level N
+                level = self.progressive_received_counts[item_name]
+                self.progressive_received_counts[item_name] += 1
+                level_items = expand_progressive(item_name, level, level + 1)
+                if level_items:
+                    queue_items.extend(level_items)
+                    entries.append((idx, None, level_items))
+                else:
+                    logger.warning(f"Progressive item {item_name} already at max level "
+                                   f"({progressive_max_level(item_name)})")
+            else:
+                queue_items.append(item_name)
+                entries.append((idx, None, [item_name]))
+
+        if self._ensure_bridge_transport().sequenced:
+            if not self._send_sequenced_items(entries):
+                self._seed_progressive_received_counts()
+                return
+        else:
+            if pending_traps:
+                self._send_traps_to_oblivion(pending_traps)
+
+            if queue_items and not self._append_items_to_queue(queue_items):
+                # Leave the cursor alone so these items are retried on the next delivery
+                self._seed_progressive_received_counts()
+                return
+
+        self.delivery_cursor = end
+        # Persist the cursor only once the queued items are actually on disk
+        self.bridge_writer.call_after_flush(self._save_delivery_cursor)
+
+    def _read_queued_counts(self) -> Counter:
+        """Items waiting in `_items.txt`, including appends still buffered."""
+        self.bridge_writer.flush()
         queue_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_items.txt")
-        queued_items = []
         if os.path.exists(queue_path):
             try:
                 with open(queue_path, "r") as f:
-                    queued_items = [line.strip() for line in f if line.strip()]
+                    return count_queue_lines(line.strip() for line in f if line.strip())
             except Exception as e:
                 logger.error(f"Error reading queue file: {e}")
+        return Counter()
+
+    def _reconcile_items_with_bridge(self, queued_counts: Counter):
+        """Full delivery pass: diff every received item against the bridge status (read just
+        before) and the queue file contents."""
         
         # Build list of items that need to be sent, separating traps from regular items
-        from worlds.oblivion.Items import item_table, trap_code_map
+        from worlds.oblivion.Items import item_table, item_id_to_name, trap_code_map
         from BaseClasses import ItemClassification
         received_items = []
         # (index_in_items_received, trap_code) pairs for pending traps
         pending_traps: List[tuple] = []
+        end = len(self.items_received)
 
         for idx, network_item in enumerate(self.items_received):
             # Look up item name by ID
-            item_name = None
-            for name, data in item_table.items():
-                if data.id == network_item.item:
-                    item_name = name
-                    break
+            item_name = item_id_to_name.get(network_item.item)
             if not item_name:
                 continue
             # Traps are routed separately, never to _items.txt
@@ -2417,10 +2761,8 @@ class OblivionContext(CommonContext):
                 regular_items.append(item_name)
         
         # Handle regular items with normal counting
-        from collections import Counter
         regular_received_counts = Counter(regular_items)
         processed_counts = self.bridge_processed_items
-        queued_counts = Counter(queued_items)
         
         new_regular_items = []
         for item_name, received_count in regular_received_counts.items():
@@ -2436,15 +2778,10 @@ class OblivionContext(CommonContext):
         progressive_received_counts = Counter(progressive_items)
 
         for item_name, received_count in progressive_received_counts.items():
-            max_level = len(self.progressive_lookups[item_name])
-            for level in range(min(received_count, max_level)):
-                level_items = self.progressive_lookups[item_name][level]
-                if not isinstance(level_items, list):
-                    level_items = [level_items]
-                for level_item in level_items:
-                    # Only queue if not already processed by bridge and not already in the queue
-                    if processed_counts.get(level_item, 0) == 0 and queued_counts.get(level_item, 0) == 0:
-                        new_progressive_items.append(level_item)
+            for level_item in expand_progressive(item_name, 0, received_count):
+                # Only queue if not already processed by bridge and not already in the queue
+                if processed_counts.get(level_item, 0) == 0 and queued_counts.get(level_item, 0) == 0:
+                    new_progressive_items.append(level_item)
 
         # Combine all new items
         new_items = new_regular_items + new_progressive_items
@@ -2454,19 +2791,65 @@ class OblivionContext(CommonContext):
             queue_items = self._process_progressive_items(new_items)
             
             if queue_items:
-                self._append_items_to_queue(queue_items)
+                if not self._append_items_to_queue(queue_items):
+                    return
             else:
                 logger.info("No items to send after progressive processing")
+
+        # Everything up to here is now either processed by the mod or queued for it
+        self.delivery_cursor = end
+        self.progressive_received_counts = progressive_received_counts
+        self.bridge_writer.call_after_flush(self._save_delivery_cursor)
+
+    def _seed_progressive_received_counts(self):
+        """Count progressive copies received before the delivery cursor."""
+        from worlds.oblivion.Items import item_id_to_name
+        counts = Counter()
+        for network_item in self.items_received[:self.delivery_cursor or 0]:
+            item_name = item_id_to_name.get(network_item.item)
+            if item_name in self.progressive_states:
+                counts[item_name] += 1
+        self.progressive_received_counts = counts
+
+    async def _load_delivery_cursor(self):
+        """Load how many items_received entries were already handed to the mod this session."""
+        if self.state_store is None:
+            return
+        try:
+            value = await self.bridge_io.run(self.state_store.get, "delivery_cursor", "")
+            if value.isdigit():
+                self.delivery_cursor = int(value)
+                self._seed_progressive_received_counts()
+        except Exception as e:
+            logger.error(f"Error loading delivery cursor: {e}")
+
+    def _save_delivery_cursor(self):
+        if self.delivery_cursor is not None:
+            self._store_update("set", "delivery_cursor", self.delivery_cursor)
             
-    def _append_items_to_queue(self, items):
-        """Append items to the game's item queue file."""
+    def _append_items_to_queue(self, items) -> bool:
+        """Append items to the game's item queue (written behind by bridge_writer)."""
         try:
-            queue_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_items.txt")
-            with open(queue_path, "a") as f:
-                for item_name in items:
-                    f.write(f"{item_name}\n")
+            self._ensure_bridge_transport().send_items(list(items))
+            return True
         except Exception as e:
             logger.error(f"Error adding items to queue: {e}")
+            return False
+
+    def _send_sequenced_items(self, entries: List[tuple]) -> bool:
+        """Send items and traps tagged with their items_received index, in index order."""
+        transport = self._ensure_bridge_transport()
+        try:
+            for idx, trap_code, items in entries:
+                if trap_code:
+                    transport.send_traps([(idx, trap_code)])
+                    self._record_sent_traps([idx])
+                else:
+                    transport.send_items(items, idx)
+        except Exception as e:
+            logger.error(f"Error sending items to the mod: {e}")
+            return False
+        return True
 
     def _send_traps_to_oblivion(self, pending_traps: List[tuple]):
         """Write pending trap codes to the _traps.txt file for the mod to process.
@@ -2478,39 +2861,32 @@ class OblivionContext(CommonContext):
         """
         if not self.file_prefix or not pending_traps:
             return
-        traps_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_traps.txt")
         try:
-            with open(traps_path, "a") as f:
-                for idx, trap_code in pending_traps:
-                    f.write(f"{trap_code}\n")
-                    self.sent_trap_indices.add(idx)
-            self._save_sent_trap_indices()
+            self._ensure_bridge_transport().send_traps(pending_traps)
+            self._record_sent_traps(idx for idx, _trap_code in pending_traps)
         except Exception as e:
             logger.error(f"Error writing trap file: {e}")
 
-    async def _send_deathlink_to_mod(self):
-        """Send deathlink notification to the mod via a signal file."""
+    async def _send_deathlink_to_mod(self) -> bool:
+        """Signal the mod to kill the player. Returns False if the signal could not be written."""
         if not self.file_prefix:
             logger.warning("[DeathLink] Cannot send to mod: file_prefix not set")
             if not self._load_connection_info():
                 logger.error("[DeathLink] Failed to load connection info")
-                return
-        
-        if not self.deathlink_pending:
-            logger.debug("[DeathLink] No pending deathlink to send")
-            return
+                return False
+
+        if not self._mod_online():
+            # Stays queued (repeated deaths coalesce) until the mod is back
+            logger.debug("[DeathLink] Mod offline, deathlink kept pending")
+            return False
             
         try:
-            # Create a blank signal file that the mod will detect and delete
-            deathlink_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_deathlink.txt")
-            
-            with open(deathlink_path, "w") as f:
-                f.write("")  # Blank file
-            
-            self.deathlink_pending = False
-            
+            transport = self._ensure_bridge_transport()
+            await self._transport_io(transport, transport.send_deathlink)
+            return True
         except Exception as e:
             logger.error(f"Error sending deathlink to mod: {e}")
+            return False
 
     async def _wait_for_connection_data(self):
         """Wait for missing_locations to be populated (indicates full connection)."""
@@ -2523,7 +2899,277 @@ class OblivionContext(CommonContext):
                 logger.warning("Timeout waiting for missing_locations to populate, proceeding anyway")
                 break
     
-    async def _check_for_locations(self, force_check=False):
+    def _queue_location(self, location_id: Optional[int], new_locations: Dict[int, None]):
+        """Queue a location for this batch if it is still missing."""
+        if location_id is not None and location_id in self.missing_locations:
+            new_locations[location_id] = None
+
+    async def _on_completed_location(self, item: str, route: Route, new_locations: Dict[int, None]):
+        """Completion tokens, Main Quest milestones and sidequests."""
+        if route.value is None:
+            logger.error(f"Location '{route.name}' not found in location table")
+            return
+        self._queue_location(route.value, new_locations)
+
+    async def _on_gate_closed(self, item: str, route: Route, new_locations: Dict[int, None]):
+        # Award the next available gate location
+        self._queue_location(self.completion_router.gate_cursor.take(self.missing_locations), new_locations)
+
+    async def _on_skill_increase(self, item: str, route: Route, new_locations: Dict[int, None]):
+        # Basic safety check: ensure class system is enabled
+        if not self.slot_data.get("selected_class"):
+            logger.warning(f"Class system disabled, ignoring skill increase: {item}")
+            return
+        cursor = self.completion_router.skill_cursors.get(route.value) if route.value else None
+        if cursor is None:
+            return
+
+        # Next missing skill increase location for this skill
+        location_id = cursor.peek(self.missing_locations)
+        if location_id is None:
+            # Skill may be excluded - skip silently
+            return
+        next_skill_increase_num = cursor.numbers[location_id]
+
+        # Validate against progressive state bounds
+        progressive_class_level_item_name = self.slot_data.get("progressive_class_level_item_name")
+        if not progressive_class_level_item_name:
+            return
+        progressive_class_level_count = self.tracker.count(progressive_class_level_item_name, self.slot)
+        max_skill_increases = progressive_class_level_count * 2
+        if next_skill_increase_num > max_skill_increases:
+            logger.warning(f"Skill increase {next_skill_increase_num} exceeds progressive state bounds ({max_skill_increases}): {item}")
+            return
+        self._queue_location(cursor.take(self.missing_locations), new_locations)
+
+    async def _on_dungeon_cleared(self, item: str, route: Route, new_locations: Dict[int, None]):
+        if route.value is None:
+            logger.warning(f"Unknown or unselected dungeon entry: {item}")
+            return
+        # Only award if the dungeon is currently accessible (region access owned)
+        is_accessible = False
+        try:
+            if self.tracker:
+                is_accessible = self.tracker.check_location_accessibility(route.name)
+        except Exception:
+            is_accessible = False
+        if not is_accessible:
+            # Silently ignore early completion; player must redo later when accessible
+            return
+        self._queue_location(route.value, new_locations)
+
+    async def _on_victory(self, item: str, route: Route, new_locations: Dict[int, None]):
+        if not self.goal_reached:
+            self.goal_reached = True
+            self._store_update("set", "goal_reached", 1)
+        await self._send_goal()
+
+    async def _on_deathlink_completion(self, item: str, route: Route, new_locations: Dict[int, None]):
+        if self.deathlink_enabled:
+            # Rate limited (and not echoed right after a death we received)
+            await self.deathlink.died("The Adventurer of Cyrodiil has fallen.")
+
+    async def _on_nirnroot_harvested(self, item: str, route: Route, new_locations: Dict[int, None]):
+        # One check per harvest: the first unchecked Nirnroot locations
+        for location_id in self.completion_router.nirnroot_cursor.take_many(self.missing_locations, route.count):
+            self._queue_location(location_id, new_locations)
+
+    def _kill_accessible(self, location_id: int) -> bool:
+        try:
+            if self.tracker:
+                return self.tracker.check_location_accessibility(self.completion_router.kill_names[location_id])
+        except Exception:
+            return True
+        return False
+
+    async def _on_kill(self, item: str, route: Route, new_locations: Dict[int, None]):
+        # Award the next missing kill locations that are in logic
+        cursor = self.completion_router.kill_cursors[route.value]
+        candidates = cursor.peek_many(self.missing_locations, route.count)
+        if not candidates:
+            return
+        # Kill N needs ceil(N / kills_per_region) regions, so once a kill is out of logic all
+        # higher ones are too: find the in-logic prefix, usually with a single check
+        in_logic = len(candidates)
+        if not self._kill_accessible(candidates[-1]):
+            low, in_logic = 0, len(candidates) - 1
+            while low < in_logic:
+                middle = (low + in_logic) // 2
+                if self._kill_accessible(candidates[middle]):
+                    low = middle + 1
+                else:
+                    in_logic = middle
+            # Silently skip the rest (mirrors skill increase cap pattern)
+            logger.debug(f"{self.completion_router.kill_names[candidates[in_logic]]} is out of logic "
+                         f"(insufficient region access), skipping {len(candidates) - in_logic} kill(s)")
+        for location_id in cursor.take_many(self.missing_locations, in_logic):
+            self._queue_location(location_id, new_locations)
+
+    async def _on_gold_collected(self, item: str, route: Route, new_locations: Dict[int, None]):
+        # Unknown thresholds are skipped silently
+        self._queue_location(route.value, new_locations)
+
+    async def _on_doomstone_visited(self, item: str, route: Route, new_locations: Dict[int, None]):
+        if route.value is None:
+            logger.error(f"Location 'Visit the {route.name} Stone' not found in location table")
+            return
+        self._queue_location(route.value, new_locations)
+
+    async def _on_ignored_completion(self, item: str, route: Route, new_locations: Dict[int, None]):
+        pass
+
+    async def _on_unknown_completion(self, item: str, route: Route, new_locations: Dict[int, None]):
+        logger.warning(f"Unknown completion entry: {item}")
+
+    def _ensure_bridge_transport(self) -> BridgeTransport:
+        """The transport for the current session: the socket while the mod is connected to it,
+        the journal once the mod announced it, else plain files."""
+        socket_transport = self.bridge_socket.transport if self.bridge_socket else None
+        if socket_transport is not None:
+            if socket_transport.connected and socket_transport.prefix == self.file_prefix:
+                self.bridge_transport = socket_transport
+                return socket_transport
+            if self.bridge_transport is socket_transport:
+                # The mod dropped the socket: the file transports take over what it did not ack
+                self.bridge_transport = None
+                self._rewind_undelivered(socket_transport.take_undelivered())
+        transport = self.bridge_transport
+        if transport is None or getattr(transport, "prefix", None) != self.file_prefix:
+            transport = None
+        journal = self.mod_journal
+        if transport is not journal and journal is not None and journal.prefix == self.file_prefix:
+            transport = journal
+            logger.info("[Bridge] Mod speaks the journal protocol, switching bridge transport")
+        if transport is None:
+            transport = LegacyFileTransport(self.oblivion_save_path, self.file_prefix, self.bridge_writer)
+            self._apply_mod_features(transport)
+        self.bridge_transport = transport
+        if self.completion_watcher is not None:
+            self.completion_watcher.names.update(transport.watched_files())
+        return transport
+
+    async def _probe_mod_journal(self):
+        """Check whether the mod has announced the journal protocol and, if so, open the journals.
+        Both touch files, so they run on the I/O thread."""
+        if not self.file_prefix or (self.mod_journal is not None and self.mod_journal.prefix == self.file_prefix):
+            return
+        prefix = self.file_prefix
+        if await self.bridge_io.run(mod_supports_journal, self.oblivion_save_path, prefix):
+            journal = await self.bridge_io.run(JournalTransport, self.oblivion_save_path, prefix, self.bridge_writer)
+            if prefix == self.file_prefix:
+                self.mod_journal = journal
+
+    async def _transport_io(self, transport: BridgeTransport, method):
+        """Call a transport method, on the I/O thread when it touches files."""
+        if transport.file_backed:
+            return await self.bridge_io.run(method)
+        return method()
+
+    def _apply_mod_features(self, transport: LegacyFileTransport):
+        """Use the optional file formats the mod announced in its heartbeat."""
+        transport.counted_items = self._mod_supports("item_counts")
+        if self._mod_supports("item_event_ring"):
+            ring_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_item_events_ring.txt")
+            if self.item_event_ring is None or self.item_event_ring.path != ring_path:
+                self.item_event_ring = ItemEventRing(ring_path, ITEM_EVENT_RING_CAPACITY, io=self.bridge_io)
+            transport.event_ring = self.item_event_ring
+        else:
+            transport.event_ring = None
+
+    def _session_heartbeat(self) -> ModHeartbeat:
+        heartbeat_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_heartbeat.txt")
+        if self.mod_heartbeat is None or self.mod_heartbeat.path != heartbeat_path:
+            self.mod_heartbeat = ModHeartbeat(heartbeat_path, MOD_HEARTBEAT_INTERVAL * MOD_HEARTBEAT_MISSES)
+        return self.mod_heartbeat
+
+    async def _refresh_mod_heartbeat(self):
+        """Re-read the heartbeat file on the I/O thread; the liveness checks use what it saw."""
+        if self.file_prefix:
+            await self.bridge_io.run(self._session_heartbeat().refresh)
+
+    def _mod_online(self) -> bool:
+        """Whether the mod is running (always true for mods without a heartbeat)."""
+        if not self.file_prefix:
+            return True
+        if self.bridge_socket and self.bridge_socket.transport.connected:
+            return True
+        return self._session_heartbeat().online()
+
+    def _mod_supports(self, feature: str) -> bool:
+        return bool(self.file_prefix) and feature in self._session_heartbeat().features()
+
+    def _compact_item_queue(self):
+        """Collapse duplicate lines in `_items.txt` while the mod is not reading it (I/O thread)."""
+        if not self._mod_supports("item_counts"):
+            return
+        self.bridge_writer.flush()
+        queue_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_items.txt")
+        try:
+            before, after = compact_queue_file(queue_path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error compacting item queue: {e}")
+            return
+        if after < before:
+            logger.info(f"[Bridge] Compacted item queue from {before} to {after} lines")
+
+    async def _check_mod_liveness(self):
+        """Notice the mod going away or coming back; on return, write everything buffered."""
+        await self._refresh_mod_heartbeat()
+        online = self._mod_online()
+        if isinstance(self.bridge_transport, LegacyFileTransport):
+            self._apply_mod_features(self.bridge_transport)
+        if online == self.mod_online:
+            return
+        self.mod_online = online
+        if not online:
+            logger.info("[Bridge] Mod heartbeat stopped, holding items until the game is back")
+            # Nothing is appended while offline, so the queue can be compacted safely now
+            self.bridge_io.submit(self._compact_item_queue)
+            return
+        logger.info(f"[Bridge] Mod is back, sending buffered items and {len(self.offline_item_events)} item events")
+        transport = self._ensure_bridge_transport()
+        try:
+            while self.offline_item_events:
+                transport.send_item_event(self.offline_item_events[0])
+                self.offline_item_events.popleft()
+        except Exception as e:
+            logger.error(f"Error writing transfer log: {e}")
+        self.item_delivery.trigger()
+        self.deathlink.trigger()
+
+    def _rewind_undelivered(self, indices: List[int]):
+        """Make items_received entries that were sent but never acknowledged deliverable again."""
+        if not indices:
+            return
+        traps = [idx for idx in indices if idx in self.sent_trap_indices]
+        if traps:
+            self.sent_trap_indices.difference_update(traps)
+            self._store_update("remove_trap_indices", traps)
+        if self.delivery_cursor is not None and min(indices) < self.delivery_cursor:
+            self.delivery_cursor = min(indices)
+            self._seed_progressive_received_counts()
+            self._save_delivery_cursor()
+        self.item_delivery.trigger()
+
+    async def _start_bridge_socket(self):
+        """Start listening for the mod on a loopback socket, if enabled."""
+        if not self.bridge_socket_kind or self.bridge_socket is not None:
+            return
+        # A Unix socket gets its own private directory, so daemon slots sharing a process do not collide
+        server = SocketBridgeServer(
+            self.bridge_socket_kind,
+            on_activity=lambda: self.completion_watcher.notify() if self.completion_watcher else None)
+        try:
+            address = await server.start()
+        except OSError as e:
+            logger.error(f"[Bridge] Could not start the socket bridge, using files: {e}")
+            return
+        self.bridge_socket = server
+        logger.info(f"[Bridge] Socket bridge listening on {address}")
+
+    async def _check_for_locations(self):
         """Check for completed locations from the game."""
         # Ensure we have the necessary connection data
         if not self.file_prefix:
@@ -2536,267 +3182,56 @@ class OblivionContext(CommonContext):
         if not hasattr(self, 'missing_locations') or not hasattr(self, 'checked_locations'):
             return
             
-        completion_path = os.path.join(self.oblivion_save_path, f"{self.file_prefix}_completed.txt")
-        
-        if not os.path.exists(completion_path):
-            return
-            
         try:
-            # Check file modification time to avoid redundant processing
-            file_mtime = os.path.getmtime(completion_path)
-            if not force_check and file_mtime <= self.last_completion_check:
+            transport = self._ensure_bridge_transport()
+            # Claim the lines written so far; later mod writes are picked up by the next claim
+            completed_items = await self._transport_io(transport, transport.claim_completions)
+            if completed_items is None:
+                # Nothing new from the mod; retry unconfirmed checks when due
+                await self._flush_pending_checks()
                 return
-                
-            self.last_completion_check = file_mtime
-            
-            # Read completion tokens from file
-            with open(completion_path, "r") as f:
-                completed_items = [line.strip() for line in f.readlines() if line.strip()]
-            
-            # Build location ID lookup table from pre-defined locations
-            name_to_id_map = {name: data.id for name, data in Locations.location_table.items()}
             
-            # Get configuration values for processing
-            dungeons_selected_count = self.slot_data.get("dungeons_selected", 0)
+            if self.completion_router is None:
+                self.completion_router = CompletionRouter(self.slot_data, self.completion_tokens)
+                self.completion_router.seed(self.missing_locations, self.pending_checks)
+            router = self.completion_router
                 
-            # Process each completion entry
-            new_locations = []
-            
-            # Find the starting gate number
-            next_gate_num = 1
-            for i in range(1, 21):  # Up to 20 gates
-                location_name = f"Gate {i} Closed"
-                if location_name in name_to_id_map:
-                    location_id = name_to_id_map[location_name]
-                    if location_id in self.missing_locations:
-                        next_gate_num = i
-                        break
+            # Location ids to send, in completion order (dict doubles as an ordered set)
+            new_locations: Dict[int, None] = {}
+            # High-rate events (kills, harvests) are summed and expanded once per batch
+            counted: Dict[Route, list] = {}
             
             for item in completed_items:
-                # Check if this is a gate closed log entry
-                if item == "Oblivion Gate Closed":
-                    # Find the next available gate location
-                    location_name = f"Gate {next_gate_num} Closed"
-                    if location_name in name_to_id_map:
-                        location_id = name_to_id_map[location_name]
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                            next_gate_num += 1
-                        else:
-                            # We reached the maximum number of gates, so we can't award any more
-                            #logger.warning(f"Could not award Gate, '{location_name}' is not available or already queued.")
-                            pass
-                    else:
-                        logger.error(f"Location '{location_name}' not found in location table")
-                        
-                # Check if this is a Class Skill Increase text (format: "SkillName Skill Increase")
-                elif " Skill Increase" in item and not item.endswith(" "):
-                    # Parse class skill item: "SkillName Skill Increase"
-                    skill_name = item.replace(" Skill Increase", "")
-                    
-                    # Basic safety check: ensure class system is enabled
-                    selected_class = self.slot_data.get("selected_class")
-                    if not selected_class:
-                        logger.warning(f"Class system disabled, ignoring skill increase: {item}")
-                        continue
-                    
-                    # Find the next available skill increase number for this skill
-                    # Look for the next missing location for this skill
-                    next_skill_increase_num = None
-                    for skill_increase_num in range(1, 41):  # Up to 40 skill increases
-                        location_name = f"{skill_name} Skill Increase {skill_increase_num}"
-                        if location_name in name_to_id_map:
-                            location_id = name_to_id_map[location_name]
-                            if location_id in self.missing_locations:
-                                next_skill_increase_num = skill_increase_num
-                                break
-                    
-                    if next_skill_increase_num is None:
-                        # Skill may be excluded - skip silently
-                        continue
-                    
-                    # Validate against progressive state bounds
-                    progressive_class_level_item_name = self.slot_data.get("progressive_class_level_item_name")
-                    if not progressive_class_level_item_name:
-                        continue
-                    progressive_class_level_count = self.tracker.count(progressive_class_level_item_name, self.slot)
-                    max_skill_increases = progressive_class_level_count * 2
-                    
-                    if next_skill_increase_num > max_skill_increases:
-                        logger.warning(f"Skill increase {next_skill_increase_num} exceeds progressive state bounds ({max_skill_increases}): {item}")
-                        continue
-                    
-                    # Find the corresponding location
-                    location_name = f"{skill_name} Skill Increase {next_skill_increase_num}"
-                    if location_name in name_to_id_map:
-                        location_id = name_to_id_map[location_name]
-                        
-                        # Only add if this location is still missing and not already queued
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                        else:
-                            #logger.warning(f"Could not award Class Skill Increase, '{location_name}' is not available or already queued.")
-                            pass
-                    else:
-                        logger.error(f"Location '{location_name}' not found in location table")
-                        
-                # Check if this is a specific dungeon cleared text, e.g., "Moss Rock Cavern Dungeon Cleared"
-                elif item.endswith(" Dungeon Cleared"):
-                    dungeon_name = item[: -len(" Dungeon Cleared")]
-                    selected_dungeons = set(self.slot_data.get("selected_dungeons", []))
-                    if dungeon_name in selected_dungeons and dungeon_name in name_to_id_map:
-                        # Only award if the dungeon is currently accessible (region access owned)
-                        is_accessible = False
-                        try:
-                            if self.tracker:
-                                is_accessible = self.tracker.check_location_accessibility(dungeon_name)
-                        except Exception:
-                            is_accessible = False
-                        if not is_accessible:
-                            # Silently ignore early completion; player must redo later when accessible
-                            continue
-                        location_id = name_to_id_map[dungeon_name]
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                    else:
-                        logger.warning(f"Unknown or unselected dungeon entry: {item}")
-                        
-                # Check if this is a Victory completion
-                elif item == "Victory":
-                    if not self.victory_sent:
-                        from NetUtils import ClientStatus
-                        await self.send_msgs([{ "cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL }])
-                        self.victory_sent = True
-                        
-                # Check if this is a Deathlink
-                elif item == "Deathlink":
-                    if self.deathlink_enabled:
-                        # Only send deathlink if we haven't sent one recently
-                        current_time = time.time()
-                        if current_time - self.last_death_sent > 3.0:  # 3 second cooldown
-                            await self.send_death("The Adventurer of Cyrodiil has fallen.")
-                            self.last_death_sent = current_time
-                
-                # Check if this is a Nirnroot Harvested event
-                elif item == "Nirnroot Harvested":
-                    nirnroot_count = self.slot_data.get("nirnroot_count", 100)
-                    
-                    # Find the first unchecked Nirnroot location
-                    for nirnroot_num in range(1, nirnroot_count + 1):
-                        location_name = f"Nirnroot {nirnroot_num} Harvested"
-                        if location_name in name_to_id_map:
-                            location_id = name_to_id_map[location_name]
-                            if location_id in self.missing_locations and location_id not in new_locations:
-                                new_locations.append(location_id)
-                                break  # Only send one check per harvest event
-
-                # Kill location events
-                elif item in ("Dungeon Kill", "Overworld Kill"):
-                    kill_type = "dungeon" if item == "Dungeon Kill" else "overworld"
-                    total_kills = self.slot_data.get(f"{kill_type}_kills", 0)
-                    if total_kills == 0:
-                        continue
-
-                    # Find the next missing kill location and check it is in logic
-                    for kill_num in range(1, total_kills + 1):
-                        location_name = f"{'Dungeon' if kill_type == 'dungeon' else 'Overworld'} Kill {kill_num}"
-                        if location_name in name_to_id_map:
-                            location_id = name_to_id_map[location_name]
-                            if location_id in self.missing_locations and location_id not in new_locations:
-                                # Silently skip if out of logic (mirrors skill increase cap pattern)
-                                is_accessible = False
-                                try:
-                                    if self.tracker:
-                                        is_accessible = self.tracker.check_location_accessibility(location_name)
-                                except Exception:
-                                    is_accessible = True
-                                if not is_accessible:
-                                    logger.debug(f"{location_name} is out of logic (insufficient region access), skipping kill")
-                                    break  # Higher-numbered kills are also out of logic
-                                new_locations.append(location_id)
-                                break
-                
-                # Check if this is a specific gold threshold event (for Treasure Hunter goal)
-                elif item.endswith(" Gold Collected"):
-                    try:
-                        # Extract the amount from the item name
-                        amount_str = item.replace(" Gold Collected", "")
-                        amount = int(amount_str)
-                        
-                        # Map to location name format
-                        location_name = f"Gold: {amount} Collected"
-                        if location_name in name_to_id_map:
-                            location_id = name_to_id_map[location_name]
-                            if location_id in self.missing_locations and location_id not in new_locations:
-                                new_locations.append(location_id)
-                    except (ValueError, AttributeError):
-                        # Invalid format, skip
-                        pass
-                        
-
-
-                        
-                # Check if this is an Ayleid Well Visited completion (now a sidequest)
-                elif item == "Ayleid Well Visited":
-                    location_name = "Visit an Ayleid Well"
-                    # Check if this sidequest is in the selected sidequests
-                    if location_name in self.slot_data.get("selected_sidequests", []):
-                        if location_name in name_to_id_map:
-                            location_id = name_to_id_map[location_name]
-                            if location_id in self.missing_locations and location_id not in new_locations:
-                                new_locations.append(location_id)
-
-                # Doomstone visits
-                elif item.endswith(" Doomstone Visited"):
-                    stone_prefix = item[:-len(" Doomstone Visited")]
-                    location_name = f"Visit the {stone_prefix} Stone"
-                    if location_name in name_to_id_map:
-                        location_id = name_to_id_map[location_name]
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                    else:
-                        logger.error(f"Location '{location_name}' not found in location table")
-                
-                # Check for sidequest completions
-                elif item in self.slot_data.get("selected_sidequests", []):
-                    # This is a selected sidequest location
-                    location_name = item
-                    if location_name in name_to_id_map:
-                        location_id = name_to_id_map[location_name]
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                    else:
-                        logger.error(f"Location '{location_name}' not found in location table")
-                        
-                # Check if this is a completion token
-                elif item in self.completion_tokens:
-                    location_name = self.completion_tokens[item]
-                    
-                    if location_name in name_to_id_map:
-                        location_id = name_to_id_map[location_name]
-                        if location_id in self.missing_locations and location_id not in new_locations:
-                            new_locations.append(location_id)
-                    else:
-                        logger.error(f"Location '{location_name}' not found in location table")
-                else:
-                    logger.warning(f"Unknown completion entry: {item}")
+                route = router.route(item)
+                if route.kind in Completions.COUNTED_KINDS:
+                    key = route._replace(count=1)
+                    counted.setdefault(key, [item, 0])[1] += route.count
+                    continue
+                await self._completion_handlers[route.kind](item, route, new_locations)
+            for route, (item, count) in counted.items():
+                await self._completion_handlers[route.kind](item, route._replace(count=count), new_locations)
                             
-            # Send location checks to server
+            # Journal the checks before the completion lines are dropped, then send
+            # everything pending in one batch (a no-op while disconnected)
             if new_locations:
-                found_locations = await self.check_locations(new_locations)
-                for location_id in found_locations:
-                    location_name = self.location_names.lookup_in_game(location_id, self.game)
-                    if self.tracker:
-                        self.tracker.update_locations()
+                self._queue_pending_checks(list(new_locations))
+            found_locations = await self._flush_pending_checks()
+            if found_locations and self.tracker:
+                self.tracker.update_locations()
             
-            # Always delete the completion file after processing
+            # Only drop the claimed lines once they have been handled
             try:
-                os.remove(completion_path)
+                await self._transport_io(transport, transport.commit_completions)
             except Exception as delete_error:
-                logger.error(f"Failed to delete completion file: {delete_error}")
+                logger.error(f"Failed to commit completions: {delete_error}")
+            # The mod may have written more while we were processing
+            if self.completion_watcher and await self._transport_io(transport, transport.completions_pending):
+                self.completion_watcher.notify()
                 
         except Exception as e:
             logger.error(f"Error checking locations: {e}")
+            # Cursors may have advanced past ids that were never sent; reseed on the retry
+            self.completion_router = None
             import traceback
             logger.error(traceback.format_exc())
 
@@ -2827,6 +3262,12 @@ class OblivionContext(CommonContext):
                 os.remove(item_events_file)
         except Exception:
             pass
+        if self.item_event_ring is not None:
+            try:
+                self.item_event_ring.delete()
+            except Exception:
+                pass
+            self.item_event_ring = None
         
     
     async def disconnect(self, allow_autoreconnect: bool = False):
@@ -2835,11 +3276,15 @@ class OblivionContext(CommonContext):
         if hasattr(self, 'game_loop_task') and self.game_loop_task and not self.game_loop_task.done():
             self.game_loop_task.cancel()
         
+        # Write out anything still buffered for the mod before the session goes away
+        self.bridge_writer.close()
+        self.deathlink.cancel()
         self._cleanup_files()
         
         # Clear connection state after cleanup
         self.slot_data = {}
         self.session_id = ""
+        self.prepared_session_id = ""
         
         await super().disconnect(allow_autoreconnect)
     
@@ -2850,21 +3295,44 @@ class OblivionContext(CommonContext):
             self.game_loop_task.cancel()
         
         # Clean up files even if we didn't properly disconnect
+        self.bridge_writer.close()
+        self.deathlink.cancel()
         self._cleanup_files()
+        if self.state_store is not None:
+            # Behind the updates still queued for it
+            self.bridge_io.submit(self.state_store.close)
+            self.state_store = None
+        if self.owns_bridge_io:
+            self.bridge_io.close()
+        self.loop_lag.stop()
+        if self.bridge_socket is not None:
+            await self.bridge_socket.stop()
+            self.bridge_socket = None
         
         # Call parent shutdown
         await super().shutdown()
             
     async def _run_game_loop(self):
-        """Main game monitoring loop - checks for location completions."""
+        """Main game monitoring loop - checks for location completions whenever the mod writes."""
         try:
+            # The journal is watched even before the mod announces it, so an upgrade mid-session is noticed
+            from_mod_journal = f"{self.file_prefix}_from_mod.journal"
+            self.completion_watcher = start_file_watcher(self.oblivion_save_path, [
+                *self._ensure_bridge_transport().watched_files(), from_mod_journal,
+                os.path.basename(self._session_heartbeat().path)])
+            probe_journal = True
             while not self.exit_event.is_set():
                 # Check if we're still connected
                 if not (hasattr(self, 'slot_data') and self.slot_data):
                     break
                     
+                if probe_journal:
+                    await self._probe_mod_journal()
+                await self._check_mod_liveness()
                 await self._check_for_locations()
-                await asyncio.sleep(0.1)
+                # Sleep until the mod touches the completion file (or the safety rescan elapses)
+                await self.completion_watcher.wait(COMPLETION_RESCAN_INTERVAL)
+                probe_journal = from_mod_journal in self.completion_watcher.take_changed()
         except asyncio.CancelledError:
             #logger.info("Game loop cancelled")
             pass
@@ -2872,8 +3340,9 @@ class OblivionContext(CommonContext):
             #logger.error(f"Game loop error: {e}")
             pass
         finally:
-            #logger.info("Game loop ended")
-            pass
+            if self.completion_watcher:
+                self.completion_watcher.stop()
+                self.completion_watcher = None
 
 
 
@@ -2917,6 +3386,15 @@ class OblivionContext(CommonContext):
 
 
 
+def configure_context(ctx: OblivionContext, args):
+    """Apply the command line options shared by the client and the daemon."""
+    ctx.bridge_socket_kind = args.bridge_socket
+    ctx.deathlink.incoming_cooldown = args.deathlink_cooldown
+    ctx.deathlink.outgoing_cooldown = args.deathlink_send_cooldown
+    ctx.session_retention = args.keep_sessions if args.keep_sessions >= 0 else None
+    ctx.archive_sessions = not args.delete_old_sessions
+
+
 def launch(*launch_args):
     """Launch the Oblivion client."""
     import colorama
@@ -2939,6 +3417,8 @@ def launch(*launch_args):
             password = args.password
         
         ctx = OblivionContext(connect, password)
+        configure_context(ctx, args)
+        ctx.loop_lag.start()
         ctx.server_task = asyncio.create_task(server_loop(ctx), name="ServerLoop")
         
         if gui_enabled:
@@ -2952,10 +3432,31 @@ def launch(*launch_args):
     
     parser = get_base_parser(description="Oblivion Remastered Client.")
     parser.add_argument("url", nargs="?", help="Archipelago connection url")
+    parser.add_argument("--bridge-socket", choices=["tcp", "unix"], default=None,
+                        help="Also offer the mod a loopback socket bridge (falls back to files)")
+    parser.add_argument("--deathlink-cooldown", type=float, default=DEFAULT_INCOMING_COOLDOWN,
+                        help="Seconds after a DeathLink reaches the game during which further deaths are merged")
+    parser.add_argument("--deathlink-send-cooldown", type=float, default=DEFAULT_OUTGOING_COOLDOWN,
+                        help="Minimum seconds between deaths sent to the room")
+    parser.add_argument("--keep-sessions", type=int, default=DEFAULT_SESSION_RETENTION,
+                        help="Old sessions to keep in the save directory besides the active one (-1: keep all)")
+    parser.add_argument("--delete-old-sessions", action="store_true",
+                        help="Delete old session files instead of moving them to archive/")
+    
+    parser.add_argument("--daemon", metavar="CONFIG", default=None,
+                        help="Run headless, hosting every slot listed in this JSON file in one process")
     
     args = parser.parse_args(launch_args)
     colorama.just_fix_windows_console()
-    asyncio.run(main(args))
+    if args.daemon:
+        from .Daemon import load_daemon_config, run_daemon
+        try:
+            slots = load_daemon_config(args.daemon)
+        except ValueError as e:
+            parser.error(str(e))
+        asyncio.run(run_daemon(slots, args))
+    else:
+        asyncio.run(main(args))
     colorama.deinit()
 
 
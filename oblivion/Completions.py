@@ -0,0 +1,218 @@
+"""
+Routing for the completion lines the mod writes to `<prefix>_completed.txt`.
+
+The router is compiled once per connection from slot_data and the static location
+table. Fixed tokens (shrine/arena/shop completion tokens, Main Quest milestones,
+sidequests, Victory, Deathlink, counted events) resolve through one dict lookup;
+parametric events ("<Skill> Skill Increase", "<Dungeon> Dungeon Cleared",
+"<Amount> Gold Collected", "<Stone> Doomstone Visited") resolve through a short
+suffix table. Location ids are resolved up front, so handling a line never has to
+format or look up location names. Families awarded in order (gates, skill
+increases, nirnroots, kills) are served by next-missing cursors.
+
+High-rate events may also arrive counted, `<event>|<count>` (e.g. `Dungeon Kill|12`);
+the client expands those in bulk against the family cursor.
+"""
+
+from collections import deque
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+
+from . import Locations
+
+# Route kinds
+LOCATION = "location"    # value: location id (None if the location is not in the table)
+VICTORY = "victory"
+DEATHLINK = "deathlink"
+GATE = "gate"
+NIRNROOT = "nirnroot"
+KILL = "kill"            # value: "dungeon" or "overworld"
+SKILL = "skill"          # value: skill name (None if the skill has no locations)
+DUNGEON = "dungeon"      # value: location id (None if the dungeon is not selected)
+GOLD = "gold"            # value: location id (None if there is no such threshold)
+DOOMSTONE = "doomstone"  # value: location id (None if the stone is unknown)
+IGNORE = "ignore"
+UNKNOWN = "unknown"
+
+# Kinds the mod may report as `<event>|<count>`, and the client aggregates per batch
+COUNTED_KINDS = (KILL, NIRNROOT)
+
+
+class Route(NamedTuple):
+    kind: str
+    value: object = None
+    name: str = ""
+    count: int = 1
+
+
+class LocationCursor:
+    """Next-missing cursor over an ordered location family ("Gate 1 Closed", "Gate 2 Closed", ...).
+
+    Seeded from missing_locations on connect, leaving out locations already handed out and
+    still awaiting server confirmation. Locations checked later (e.g. via !collect)
+    are skipped lazily, and a location that was handed out is never handed out again,
+    so each event costs amortised O(1) instead of a scan from the first location.
+    """
+
+    def __init__(self, location_ids: List[int]):
+        self.location_ids = location_ids
+        self.numbers: Dict[int, int] = {location_id: number
+                                        for number, location_id in enumerate(location_ids, start=1)}
+        self._pending: deque = deque()
+
+    def seed(self, missing_locations: Collection[int], handed_out: Collection[int] = ()):
+        self._pending = deque(location_id for location_id in self.location_ids
+                              if location_id in missing_locations and location_id not in handed_out)
+
+    def peek(self, missing_locations: Collection[int]) -> Optional[int]:
+        """The next location still missing, without consuming it."""
+        pending = self._pending
+        while pending and pending[0] not in missing_locations:
+            pending.popleft()
+        return pending[0] if pending else None
+
+    def take(self, missing_locations: Collection[int]) -> Optional[int]:
+        """Consume and return the next location still missing."""
+        location_id = self.peek(missing_locations)
+        if location_id is not None:
+            self._pending.popleft()
+        return location_id
+
+    def peek_many(self, missing_locations: Collection[int], count: int) -> List[int]:
+        """Up to `count` next missing locations, in order, without consuming them."""
+        self.peek(missing_locations)
+        locations = []
+        for location_id in self._pending:
+            if len(locations) >= count:
+                break
+            if location_id in missing_locations:
+                locations.append(location_id)
+        return locations
+
+    def take_many(self, missing_locations: Collection[int], count: int) -> List[int]:
+        """Consume and return up to `count` next missing locations."""
+        locations = []
+        while len(locations) < count:
+            location_id = self.take(missing_locations)
+            if location_id is None:
+                break
+            locations.append(location_id)
+        return locations
+
+
+def _location_route(location_name: str) -> Route:
+    data = Locations.location_table.get(location_name)
+    if data is None:
+        return Route(LOCATION, None, location_name)
+    if data.id is None:
+        # Event locations have no id and are never sent to the server
+        return Route(IGNORE, None, location_name)
+    return Route(LOCATION, data.id, location_name)
+
+
+def _location_id(location_name: str) -> Optional[int]:
+    data = Locations.location_table.get(location_name)
+    return data.id if data else None
+
+
+class CompletionRouter:
+    """Maps mod completion lines to routes with their location ids already resolved."""
+
+    def __init__(self, slot_data: dict, completion_tokens: Dict[str, str]):
+        self.exact: Dict[str, Route] = {}
+        for token, location_name in completion_tokens.items():
+            self.exact[token] = _location_route(location_name)
+
+        selected_sidequests = slot_data.get("selected_sidequests", []) or []
+        for sidequest in selected_sidequests:
+            self.exact[sidequest] = _location_route(sidequest)
+        # Ayleid Wells are a sidequest; the visit is only worth a check when selected
+        ayleid_well = "Visit an Ayleid Well"
+        self.exact["Ayleid Well Visited"] = (_location_route(ayleid_well)
+                                             if ayleid_well in selected_sidequests else Route(IGNORE))
+
+        self.exact["Victory"] = Route(VICTORY)
+        self.exact["Deathlink"] = Route(DEATHLINK)
+        self.exact["Oblivion Gate Closed"] = Route(GATE)
+        self.exact["Nirnroot Harvested"] = Route(NIRNROOT)
+        self.exact["Dungeon Kill"] = Route(KILL, "dungeon")
+        self.exact["Overworld Kill"] = Route(KILL, "overworld")
+
+        # Location families that are awarded in order ("next missing" semantics)
+        self.gate_cursor = LocationCursor([_location_id(f"Gate {i} Closed") for i in range(1, 21)])
+        skill_ids: Dict[str, List[int]] = {}
+        for location_name, data in Locations.class_skill_locations.items():
+            skill_name = location_name.rsplit(" Skill Increase ", 1)[0]
+            skill_ids.setdefault(skill_name, []).append(data.id)
+        self.skill_cursors: Dict[str, LocationCursor] = {
+            skill_name: LocationCursor(ids) for skill_name, ids in skill_ids.items()
+        }
+        nirnroot_count = slot_data.get("nirnroot_count", 100)
+        self.nirnroot_cursor = LocationCursor([
+            location_id for location_id in
+            (_location_id(f"Nirnroot {i} Harvested") for i in range(1, nirnroot_count + 1))
+            if location_id is not None
+        ])
+        self.kill_cursors: Dict[str, LocationCursor] = {}
+        self.kill_names: Dict[int, str] = {}
+        for kill_type, label in (("dungeon", "Dungeon"), ("overworld", "Overworld")):
+            total_kills = slot_data.get(f"{kill_type}_kills", 0)
+            kill_ids = []
+            for i in range(1, total_kills + 1):
+                location_id = _location_id(f"{label} Kill {i}")
+                if location_id is not None:
+                    kill_ids.append(location_id)
+                    self.kill_names[location_id] = f"{label} Kill {i}"
+            self.kill_cursors[kill_type] = LocationCursor(kill_ids)
+
+        # Parametric events: (suffix, kind, parameter parser, parameter -> value)
+        selected_dungeons = slot_data.get("selected_dungeons", []) or []
+        self.suffixes: List[Tuple[str, str, Callable, dict]] = [
+            (" Skill Increase", SKILL, str, {skill: skill for skill in self.skill_cursors}),
+            (" Dungeon Cleared", DUNGEON, str, {
+                dungeon: _location_id(dungeon) for dungeon in selected_dungeons
+                if _location_id(dungeon) is not None
+            }),
+            (" Gold Collected", GOLD, int, {
+                amount: _location_id(f"Gold: {amount} Collected")
+                for amount in Locations.GOLD_CAPACITY_THRESHOLDS
+            }),
+            (" Doomstone Visited", DOOMSTONE, str, {
+                stone[len("Visit the "):-len(" Stone")]: _location_id(stone)
+                for stone in Locations.DOOMSTONE_REGIONS
+                if _location_id(stone) is not None
+            }),
+        ]
+
+    def seed(self, missing_locations: Collection[int], handed_out: Collection[int] = ()):
+        """(Re)position every family cursor on the first missing location not in `handed_out`
+        (checks sent but not yet confirmed by the server)."""
+        self.gate_cursor.seed(missing_locations, handed_out)
+        self.nirnroot_cursor.seed(missing_locations, handed_out)
+        for cursor in self.skill_cursors.values():
+            cursor.seed(missing_locations, handed_out)
+        for cursor in self.kill_cursors.values():
+            cursor.seed(missing_locations, handed_out)
+
+    def route(self, line: str) -> Route:
+        """Resolve a single completion line."""
+        route = self.exact.get(line)
+        if route is not None:
+            return route
+        event, separator, count = line.rpartition("|")
+        if separator and count.isdigit():
+            route = self.exact.get(event)
+            if route is not None and route.kind in COUNTED_KINDS:
+                return route._replace(count=int(count))
+        for suffix, kind, parse, targets in self.suffixes:
+            if line.endswith(suffix):
+                parameter = line[:-len(suffix)]
+                try:
+                    value = targets.get(parse(parameter))
+                except ValueError:
+                    value = None
+                route = Route(kind, value, parameter)
+                if value is not None:
+                    # Parametric lines repeat (the same skill, the same stone), cache them
+                    self.exact[line] = route
+                return route
+        return Route(UNKNOWN, None, line)
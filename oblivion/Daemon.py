@@ -0,0 +1,118 @@
+"""
+Headless daemon hosting several Oblivion slots in one process.
+
+Test and streaming rigs run more than one game per machine. Instead of one GUI
+client per slot, `--daemon <config.json>` runs one OblivionContext per slot in a
+single event loop. The contexts share the module-level tables (items, locations,
+completion tokens, progressive expansions) and one bridge I/O thread. The config
+lists the slots:
+
+    {"slots": [
+        {"name": "Player1", "server": "archipelago.gg:38281", "save_path": "/games/one/Saved/Archipelago"},
+        {"name": "Player2", "server": "archipelago.gg:38281", "password": "secret",
+         "save_path": "/games/two/Saved/Archipelago"}
+    ]}
+
+Each slot needs its own save path: the mod finds its session through the
+`current_connection.txt` in that directory. Slots are never prompted for input; a
+slot whose room asks for a password it was not given stops instead. Log lines
+are prefixed with the name of the slot they come from.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+
+from CommonClient import server_loop
+
+from .BridgeIO import BridgeIO
+from .Client import OblivionContext, configure_context
+
+logger = logging.getLogger("Client")
+
+# The slot whose tasks are running; tasks and callbacks inherit it from the task that created them
+current_slot: ContextVar[Optional[str]] = ContextVar("current_slot", default=None)
+
+
+@dataclass
+class SlotConfig:
+    name: str
+    server: str
+    save_path: str
+    password: Optional[str] = None
+
+
+class SlotLogFilter(logging.Filter):
+    """Prefixes log lines with the slot they were logged for."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        slot = current_slot.get()
+        if slot is not None:
+            record.msg = f"[{slot}] {record.getMessage()}"
+            record.args = ()
+        return True
+
+
+def load_daemon_config(path: str) -> List[SlotConfig]:
+    """Read and validate the daemon's slot list. Raises ValueError on a bad config."""
+    try:
+        with open(path, "r") as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read daemon config {path}: {e}")
+
+    slots = []
+    seen_paths = {}
+    for number, entry in enumerate(config.get("slots", []) if isinstance(config, dict) else [], 1):
+        missing = [key for key in ("name", "server", "save_path") if not isinstance(entry, dict) or not entry.get(key)]
+        if missing:
+            raise ValueError(f"Slot {number} in {path} is missing {', '.join(missing)}")
+        save_path = os.path.abspath(os.path.expanduser(entry["save_path"]))
+        key = os.path.normcase(save_path)
+        if key in seen_paths:
+            raise ValueError(f"Slots {seen_paths[key]} and {entry['name']} share the save path {save_path}")
+        seen_paths[key] = entry["name"]
+        slots.append(SlotConfig(entry["name"], entry["server"], save_path, entry.get("password")))
+    if not slots:
+        raise ValueError(f"No slots configured in {path}")
+    return slots
+
+
+async def run_daemon(slots: List[SlotConfig], args):
+    """Connect every slot and run until all of them exit (or the process is interrupted)."""
+    bridge_io = BridgeIO()
+    contexts: List[OblivionContext] = []
+    log_filter = SlotLogFilter()
+    logger.addFilter(log_filter)
+    try:
+        for slot in slots:
+            slot_token = current_slot.set(slot.name)
+            try:
+                ctx = OblivionContext(slot.server, slot.password, save_path=slot.save_path, bridge_io=bridge_io)
+                ctx.username = slot.name
+                ctx.headless = True
+                configure_context(ctx, args)
+                ctx.server_task = asyncio.create_task(server_loop(ctx), name=f"ServerLoop {slot.name}")
+            finally:
+                current_slot.reset(slot_token)
+            contexts.append(ctx)
+            logger.info(f"[Daemon] Hosting {slot.name} on {slot.server} (save path {slot.save_path})")
+        # One loop, so one lag monitor tells the whole story
+        contexts[0].loop_lag.start()
+        await asyncio.gather(*(ctx.exit_event.wait() for ctx in contexts))
+    finally:
+        for ctx in contexts:
+            ctx.server_address = None
+            slot_token = current_slot.set(ctx.username)
+            try:
+                await ctx.shutdown()
+            except Exception as e:
+                logger.error(f"[Daemon] Error shutting down: {e}")
+            finally:
+                current_slot.reset(slot_token)
+        bridge_io.close()
+        logger.removeFilter(log_filter)
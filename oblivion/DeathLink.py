@@ -0,0 +1,110 @@
+"""
+DeathLink event pipeline.
+
+Incoming deaths arrive in bursts in large DeathLink rooms, and each one used to
+start its own task rewriting the signal file. DeathLinkPipeline queues them (up to
+a bound, dropping the oldest), gathers a burst for a moment and turns it into a
+single signal to the mod. Deaths arriving within the cooldown after a signal are
+merged into it, since the player is already dead or reloading.
+
+Outgoing deaths (the mod reporting the player died) are rate limited by their
+own cooldown, and a death right after an incoming signal is not echoed back to
+the room.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from .SingleFlight import SingleFlight
+
+logger = logging.getLogger("Client")
+
+DEFAULT_INCOMING_COOLDOWN = 3.0
+DEFAULT_OUTGOING_COOLDOWN = 3.0
+MAX_QUEUED_DEATHS = 32
+# How long a burst is gathered before the single signal goes out
+BURST_WINDOW = 0.25
+
+
+class DeathLinkPipeline:
+    """Coalesces and rate limits DeathLink signals in both directions."""
+
+    def __init__(self, deliver: Callable[[], Awaitable[bool]], announce: Callable[[str], Awaitable[None]],
+                 incoming_cooldown: float = DEFAULT_INCOMING_COOLDOWN,
+                 outgoing_cooldown: float = DEFAULT_OUTGOING_COOLDOWN, max_queued: int = MAX_QUEUED_DEATHS):
+        # deliver() signals the mod and returns False if it could not (mod offline)
+        self.deliver = deliver
+        self.announce = announce
+        self.incoming_cooldown = incoming_cooldown
+        self.outgoing_cooldown = outgoing_cooldown
+        self.queue = deque(maxlen=max_queued)
+        self.last_signal = 0.0
+        self.last_sent = 0.0
+        self._flight = SingleFlight(self._drain, "deathlink delivery")
+        # Counters
+        self.received = 0
+        self.signals = 0
+        self.merged = 0
+        self.dropped = 0
+        self.sent = 0
+        self.suppressed = 0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.queue)
+
+    def receive(self, source: str, cause: Optional[str] = None):
+        """An incoming death from the room."""
+        self.received += 1
+        now = time.monotonic()
+        if now - self.last_signal < self.incoming_cooldown:
+            # The signal that just went out covers this one
+            self.merged += 1
+            return
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((source, cause))
+        self.trigger()
+
+    def trigger(self):
+        """Try to deliver queued deaths (e.g. once the mod is back)."""
+        if self.queue:
+            self._flight.trigger()
+
+    async def _drain(self):
+        # Let the rest of a burst arrive before signalling once for all of it
+        await asyncio.sleep(BURST_WINDOW)
+        if not self.queue:
+            return
+        if not await self.deliver():
+            # Stays queued; trigger() retries once the mod can take it
+            return
+        batch = len(self.queue)
+        source, cause = self.queue[-1]
+        self.queue.clear()
+        self.last_signal = time.monotonic()
+        self.signals += 1
+        self.merged += batch - 1
+        if batch > 1:
+            logger.info(f"[DeathLink] {batch} deaths merged into one (latest from {source})")
+        else:
+            logger.debug(f"[DeathLink] Death from {source}: {cause or 'no cause given'}")
+
+    async def died(self, cause: str) -> bool:
+        """The player died in game. Returns whether the death was sent to the room."""
+        now = time.monotonic()
+        if now - self.last_sent < self.outgoing_cooldown or now - self.last_signal < self.outgoing_cooldown:
+            # Too soon after our last death, or caused by the signal we just delivered
+            self.suppressed += 1
+            return False
+        self.last_sent = now
+        self.sent += 1
+        await self.announce(cause)
+        return True
+
+    def cancel(self):
+        self._flight.cancel()
+        self.queue.clear()
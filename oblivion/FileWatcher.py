@@ -0,0 +1,256 @@
+"""
+File change watchers for the Oblivion client <-> mod file bridge.
+
+The mod communicates with the client by writing small text files into the
+Archipelago save directory. Instead of waking the client on a fixed timer, the
+client waits on a watcher that is signalled when one of the watched files in
+that directory changes:
+
+- InotifyWatcher: Linux inotify via libc, no extra dependencies. Wakes the
+  event loop as soon as the mod writes.
+- PollingWatcher: stat()-based fallback, used on other platforms (Windows) and
+  on mounts where inotify is unreliable (FUSE, network shares). It backs off
+  while idle, but never past 0.1 s, since on those platforms it is the only
+  thing between the mod writing a file and the client noticing.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger("Client")
+
+# Filesystems where inotify either never fires for writes made by other hosts/processes
+# or is known to be unreliable (ntfs-3g, sshfs, shared folders, network shares)
+UNRELIABLE_FS_TYPES = {"9p", "cifs", "smb3", "smbfs", "nfs", "nfs4", "v9fs", "virtiofs", "vboxsf", "davfs"}
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class FileWatcher:
+    """Base watcher: signals waiters when a watched file in `directory` changes."""
+
+    backend = "none"
+
+    def __init__(self, directory: str, names: Iterable[str] = ()):
+        self.directory = directory
+        self.names: Set[str] = set(names)
+        self.wakeups = 0
+        self._changed = asyncio.Event()
+        # Watched names reported changed since the last take_changed() (None: unknown, assume all)
+        self._changed_names: Optional[Set[str]] = set()
+
+    def notify(self, names: Optional[Iterable[str]] = None):
+        """Wake any waiter. Without `names` (e.g. a forced check after reconnecting), every
+        watched file counts as changed."""
+        if names is None:
+            self._changed_names = None
+        elif self._changed_names is not None:
+            self._changed_names.update(names)
+        self.wakeups += 1
+        self._changed.set()
+
+    def take_changed(self) -> Set[str]:
+        """Watched names that changed since the last call."""
+        changed = set(self.names) if self._changed_names is None else self._changed_names & self.names
+        self._changed_names = set()
+        return changed
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a change. Returns False if the timeout elapsed without one."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+
+class InotifyWatcher(FileWatcher):
+    """Linux inotify watcher on the bridge directory, driven by the asyncio loop reader."""
+
+    backend = "inotify"
+
+    def __init__(self, directory: str, names: Iterable[str] = ()):
+        super().__init__(directory, names)
+        self._fd = -1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        wd = libc.inotify_add_watch(fd, os.fsencode(self.directory), _INOTIFY_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {self.directory}: {os.strerror(err)}")
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._loop.add_reader(fd, self._on_readable)
+        except (NotImplementedError, RuntimeError):
+            self.stop()
+            raise OSError("event loop does not support add_reader")
+
+    def stop(self):
+        if self._fd < 0:
+            return
+        try:
+            if self._loop is not None:
+                self._loop.remove_reader(self._fd)
+        except Exception:
+            pass
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+        self._fd = -1
+
+    def _on_readable(self):
+        relevant = False
+        changed: Optional[Set[str]] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 16384)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                logger.error(f"[Bridge] inotify read failed: {e}")
+                relevant = True
+                changed = None
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                _wd, mask, _cookie, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+                offset += name_len
+                if mask & (IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    # Lost events or the directory itself went away - let the caller rescan
+                    relevant = True
+                    changed = None
+                elif name in self.names:
+                    relevant = True
+                    if changed is not None:
+                        changed.add(name)
+        if relevant:
+            self.notify(changed)
+
+
+class PollingWatcher(FileWatcher):
+    """stat()-based watcher that polls quickly after activity and backs off (up to `max_interval`) while idle."""
+
+    backend = "polling"
+
+    def __init__(self, directory: str, names: Iterable[str] = (),
+                 min_interval: float = 0.05, max_interval: float = 0.1, backoff: float = 1.5):
+        super().__init__(directory, names)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self._signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _signature(self, name: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def start(self):
+        self._signatures = {name: self._signature(name) for name in self.names}
+        self._task = asyncio.create_task(self._poll(), name="bridge file poller")
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _poll(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                changed = set()
+                for name in tuple(self.names):
+                    signature = self._signature(name)
+                    if self._signatures.get(name) != signature:
+                        self._signatures[name] = signature
+                        changed.add(name)
+                if changed:
+                    self.interval = self.min_interval
+                    self.notify(changed)
+                else:
+                    self.interval = min(self.max_interval, self.interval * self.backoff)
+        except asyncio.CancelledError:
+            pass
+
+
+def _mount_fs_type(path: str) -> str:
+    """Return the filesystem type of the mount containing `path` (Linux only, '' if unknown)."""
+    try:
+        real = os.path.realpath(path)
+        best_mount, best_type = "", ""
+        with open("/proc/self/mounts", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace("\\040", " ")
+                if (real == mount_point or real.startswith(mount_point.rstrip("/") + "/")) \
+                        and len(mount_point) > len(best_mount):
+                    best_mount, best_type = mount_point, parts[2]
+        return best_type
+    except OSError:
+        return ""
+
+
+def inotify_reliable(path: str) -> bool:
+    """Whether inotify can be trusted to report writes made to files under `path`."""
+    if not sys.platform.startswith("linux"):
+        return False
+    fs_type = _mount_fs_type(path)
+    return not (fs_type.startswith("fuse") or fs_type in UNRELIABLE_FS_TYPES)
+
+
+def start_file_watcher(directory: str, names: Iterable[str] = ()) -> FileWatcher:
+    """Start the best available watcher for `directory`. Must be called from the event loop."""
+    if inotify_reliable(directory):
+        watcher = InotifyWatcher(directory, names)
+        try:
+            watcher.start()
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.debug(f"[Bridge] inotify unavailable ({e}), falling back to polling")
+    watcher = PollingWatcher(directory, names)
+    watcher.start()
+    return watcher
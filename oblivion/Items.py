@@ -486,6 +486,9 @@ for _trap_name in trap_items:
     item_table[_trap_name] = ItemData(current_id, ItemClassification.trap)
     current_id += 1
 
+# Reverse lookup used by the client to resolve received item ids
+item_id_to_name: Dict[int, str] = {data.id: name for name, data in item_table.items()}
+
 # Item groups for hinting
 item_name_groups = {
     "Shrine Token": [f"{shrine} Shrine Token" for shrine in shrine_names],
@@ -0,0 +1,91 @@
+"""
+Expansion of progressive items into the unlock tokens the mod understands.
+
+Each progressive item unlocks one level per received copy, and each level maps
+to one or more mod tokens. The tables are flattened once at import, so expanding
+from one received count to another is a single slice over the levels gained.
+"""
+
+from typing import Dict, List, Tuple
+
+from .Items import (arena_unlock_item_name, progressive_armor_set_item_name, progressive_class_level_items,
+                    progressive_nirnroot_satchel_item_name, progressive_septim_satchel_item_name,
+                    progressive_shop_stock_item_name)
+
+# Mod tokens unlocked by each level (the Nth copy received unlocks level N)
+PROGRESSIVE_LEVELS: Dict[str, List[List[str]]] = {
+    arena_unlock_item_name: [
+        ["APArenaPitDogUnlock"],
+        ["APArenaBrawlerUnlock"],
+        ["APArenaBloodletterUnlock"],
+        ["APArenaMyrmidonUnlock"],
+        ["APArenaWarriorUnlock"],
+        ["APArenaGladiatorUnlock"],
+        ["APArenaHeroUnlock"],
+    ],
+    progressive_shop_stock_item_name: [
+        ["APShopCheckValue2", "APShopCheckValue20", "APShopCheckValue200"],   # Set 2
+        ["APShopCheckValue3", "APShopCheckValue30", "APShopCheckValue300"],   # Set 3
+        ["APShopCheckValue4", "APShopCheckValue40", "APShopCheckValue400"],   # Set 4
+        ["APShopCheckValue5", "APShopCheckValue50", "APShopCheckValue500"],   # Set 5
+    ],
+    progressive_armor_set_item_name: [
+        ["APArmorTier2"],   # Tier 2 (Chainmail/Dwarven) - 1st Progressive Armor Set (early placement)
+        ["APArmorTier4"],   # Tier 4 (Elven/Ebony) - 2nd Progressive Armor Set
+        ["APArmorTier5"],   # Tier 5 (Glass/Daedric) - 3rd Progressive Armor Set
+    ],
+    progressive_nirnroot_satchel_item_name: [
+        ["APNirnrootSatchel1"],  # Capacity 5
+        ["APNirnrootSatchel2"],  # Capacity 15
+        ["APNirnrootSatchel3"],  # Capacity 30
+        ["APNirnrootSatchel4"],  # Capacity 50
+        ["APNirnrootSatchel5"],  # Capacity 100
+    ],
+    progressive_septim_satchel_item_name: [
+        ["APSeptimSatchel1"],  # Capacity 2500
+        ["APSeptimSatchel2"],  # Capacity 5000
+        ["APSeptimSatchel3"],  # Capacity 10000
+        ["APSeptimSatchel4"],  # Capacity 25000
+        ["APSeptimSatchel5"],  # Capacity Unlimited
+    ],
+    **{item_name: [[f"APClassLevel{level}"] for level in range(1, 21)]
+       for item_name in progressive_class_level_items},
+}
+
+
+class ExpansionTable:
+    """All tokens of one progressive item in level order, with the offset where each level starts."""
+
+    __slots__ = ("tokens", "offsets")
+
+    def __init__(self, levels: List[List[str]]):
+        tokens: List[str] = []
+        offsets = [0]
+        for level_tokens in levels:
+            tokens.extend(level_tokens)
+            offsets.append(len(tokens))
+        self.tokens: Tuple[str, ...] = tuple(tokens)
+        self.offsets: Tuple[int, ...] = tuple(offsets)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.offsets) - 1
+
+    def expand(self, previous: int, new: int) -> List[str]:
+        """Tokens for the levels unlocked going from `previous` to `new` received copies."""
+        previous = min(max(previous, 0), self.max_level)
+        new = min(max(new, previous), self.max_level)
+        return list(self.tokens[self.offsets[previous]:self.offsets[new]])
+
+
+EXPANSION_TABLES: Dict[str, ExpansionTable] = {item_name: ExpansionTable(levels)
+                                               for item_name, levels in PROGRESSIVE_LEVELS.items()}
+
+
+def max_level(item_name: str) -> int:
+    return EXPANSION_TABLES[item_name].max_level
+
+
+def expand_progressive(item_name: str, previous: int, new: int) -> List[str]:
+    """Mod tokens for `item_name` going from `previous` to `new` received copies."""
+    return EXPANSION_TABLES[item_name].expand(previous, new)
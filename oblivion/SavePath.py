@@ -0,0 +1,172 @@
+"""
+Save path discovery for Oblivion Remastered running under Proton (Linux).
+
+The game's Documents folder lives inside the Proton prefix of whichever Steam
+library it is installed in. Instead of globbing every Steam root and mount point
+on each launch, discovery:
+
+- reads Steam's `libraryfolders.vdf` to learn the library folders (and which of
+  them has the game installed)
+- probes the candidate folders concurrently, giving up on slow or hung mounts
+  after a timeout
+- caches the result, reusing it while the save folder still exists and no
+  `libraryfolders.vdf` has changed since
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("Client")
+
+STEAM_APP_ID = "2623190"
+# Where the game keeps its saves inside a Steam library
+SAVED_SUBPATH = os.path.join("steamapps", "compatdata", STEAM_APP_ID, "pfx", "drive_c", "users", "steamuser",
+                             "Documents", "My Games", "Oblivion Remastered", "Saved")
+PROBE_TIMEOUT = 2.0
+
+_VDF_PAIR = re.compile(r'^\s*"([^"]*)"\s+"([^"]*)"')
+
+
+def steam_roots() -> List[str]:
+    home = os.path.expanduser("~")
+    return [
+        f"{home}/.local/share/Steam",                                   # Standard Steam
+        f"{home}/.steam/debian-installation",                           # Debian
+        f"{home}/.var/app/com.valvesoftware.Steam/.local/share/Steam",  # Flatpak
+        f"{home}/snap/steam/common/.local/share/Steam",                 # Snap
+    ]
+
+
+def library_vdf_paths(roots: List[str]) -> List[str]:
+    return [os.path.join(root, "steamapps", "libraryfolders.vdf") for root in roots]
+
+
+def parse_library_folders(path: str) -> List[tuple]:
+    """(library path, has the game installed) for each library listed in a libraryfolders.vdf."""
+    libraries = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _VDF_PAIR.match(line)
+            if not match:
+                continue
+            key, value = match.groups()
+            if key == "path":
+                libraries.append([value.replace("\\\\", "\\"), False])
+            elif key == STEAM_APP_ID and libraries:
+                # Inside the library's "apps" block
+                libraries[-1][1] = True
+    return [tuple(library) for library in libraries]
+
+
+def _mount_libraries() -> List[str]:
+    """Top-level folders under /mnt and /media, where unregistered libraries usually live."""
+    candidates = []
+    for mount_root in ("/mnt", "/media"):
+        try:
+            candidates.extend(entry.path for entry in os.scandir(mount_root) if entry.is_dir())
+        except OSError:
+            continue
+    return candidates
+
+
+def candidate_libraries(roots: List[str]) -> List[str]:
+    """Libraries to probe, most likely first: libraries known to have the game, the rest of
+    the registered libraries, the Steam roots, then mount points."""
+    with_game, registered = [], []
+    for vdf_path in library_vdf_paths(roots):
+        try:
+            libraries = parse_library_folders(vdf_path)
+        except OSError:
+            continue
+        for library, has_game in libraries:
+            (with_game if has_game else registered).append(library)
+    ordered = with_game + registered + roots + _mount_libraries()
+    return list(dict.fromkeys(os.path.normpath(path) for path in ordered))
+
+
+def probe_libraries(libraries: List[str], timeout: float = PROBE_TIMEOUT) -> Optional[str]:
+    """The Saved folder of the first library (in order) that has one, probing all at once.
+
+    Probes still running after `timeout` (hung network mounts) are abandoned; they run on
+    daemon threads so they never hold up the client.
+    """
+    found: Dict[int, bool] = {}
+    done = threading.Condition()
+
+    def probe(index: int, saved: str):
+        result = os.path.isdir(saved)
+        with done:
+            found[index] = result
+            done.notify_all()
+
+    saved_paths = [os.path.join(library, SAVED_SUBPATH) for library in libraries]
+    for index, saved in enumerate(saved_paths):
+        threading.Thread(target=probe, args=(index, saved), name="save path probe", daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    with done:
+        while True:
+            # Answer as soon as every better-ranked library has been ruled out
+            for index in range(len(saved_paths)):
+                if index not in found:
+                    break
+                if found[index]:
+                    return saved_paths[index]
+            else:
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done.wait(remaining)
+    # Timed out: settle for the best library that did answer
+    for index in sorted(found):
+        if found[index]:
+            logger.warning("Save path probe timed out, some Steam libraries were not checked")
+            return saved_paths[index]
+    return None
+
+
+def _vdf_mtimes(roots: List[str]) -> Dict[str, float]:
+    mtimes = {}
+    for vdf_path in library_vdf_paths(roots):
+        try:
+            mtimes[vdf_path] = os.stat(vdf_path).st_mtime
+        except OSError:
+            continue
+    return mtimes
+
+
+def find_proton_save_path(cache_path: Optional[str] = None, timeout: float = PROBE_TIMEOUT) -> Optional[str]:
+    """Auto-detect the Archipelago folder inside the game's Proton prefix.
+
+    With `cache_path`, a previous result is reused while its folder exists and the
+    libraryfolders.vdf files are unchanged.
+    """
+    roots = steam_roots()
+    mtimes = _vdf_mtimes(roots)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            saved = cached.get("saved")
+            if saved and cached.get("vdf_mtimes") == mtimes and os.path.isdir(saved):
+                return os.path.join(saved, "Archipelago")
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    saved = probe_libraries(candidate_libraries(roots), timeout)
+    if saved is None:
+        return None
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump({"saved": saved, "vdf_mtimes": mtimes}, f)
+        except OSError as e:
+            logger.debug(f"Could not cache the save path: {e}")
+    return os.path.join(saved, "Archipelago")
@@ -0,0 +1,139 @@
+"""
+Retention for per-session files in the Archipelago save directory.
+
+Every seed leaves `AP_<name>_<session>_*` files behind (settings, state, bridge
+files), and both the client's directory scans and the mod's startup get slower as
+they pile up. The helpers here index those files by session prefix and move (or
+delete) everything but the active session and the most recently used ones.
+
+Archived sessions go to `<save dir>/archive/<prefix>/`, out of the way of the mod
+but still recoverable: connecting to an archived session again moves its files
+back (`restore_session`) before the client reads its state.
+"""
+
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("Client")
+
+ARCHIVE_DIR = "archive"
+
+# AP_<file safe player name>_<first 8 characters of the session id>_<kind>
+_SESSION_FILE = re.compile(r"^(AP_.+?_(?:[0-9A-Fa-f]{8}|nosession))_(.+)$")
+
+
+@dataclass
+class SessionFiles:
+    prefix: str
+    files: List[str] = field(default_factory=list)
+    size: int = 0
+    last_modified: float = 0.0
+
+
+def index_sessions(directory: str) -> List[SessionFiles]:
+    """Session files in `directory` grouped by prefix, most recently modified first."""
+    sessions: Dict[str, SessionFiles] = {}
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    for entry in entries:
+        match = _SESSION_FILE.match(entry.name)
+        if not match:
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+        except OSError:
+            continue
+        session = sessions.setdefault(match.group(1), SessionFiles(match.group(1)))
+        session.files.append(entry.path)
+        session.size += stat.st_size
+        session.last_modified = max(session.last_modified, stat.st_mtime)
+    return sorted(sessions.values(), key=lambda session: session.last_modified, reverse=True)
+
+
+def archive_usage(directory: str) -> int:
+    """Bytes used by archived sessions."""
+    total = 0
+    for root, _dirs, files in os.walk(os.path.join(directory, ARCHIVE_DIR)):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def collect_sessions(directory: str, keep: int, protected: Iterable[str] = (), archive: bool = True,
+                     now: Optional[float] = None, min_age: float = 3600.0) -> List[SessionFiles]:
+    """Archive (or delete) all sessions except the protected ones and the `keep` most recent.
+
+    Sessions touched within `min_age` seconds are always kept, since another client or the
+    game may still be using them. Returns the sessions that were removed.
+    """
+    protected = set(protected)
+    now = now if now is not None else time.time()
+    removed = []
+    recent = 0
+    for session in index_sessions(directory):
+        if session.prefix in protected:
+            continue
+        if recent < keep or now - session.last_modified < min_age:
+            recent += 1
+            continue
+        target = os.path.join(directory, ARCHIVE_DIR, session.prefix)
+        try:
+            if archive:
+                os.makedirs(target, exist_ok=True)
+            for path in session.files:
+                if archive:
+                    shutil.move(path, os.path.join(target, os.path.basename(path)))
+                else:
+                    os.remove(path)
+        except OSError as e:
+            logger.error(f"[Sessions] Could not {'archive' if archive else 'delete'} {session.prefix}: {e}")
+            continue
+        removed.append(session)
+    return removed
+
+
+def restore_session(directory: str, prefix: str) -> int:
+    """Move an archived session's files back into `directory`. Returns how many were restored.
+
+    Files that already exist in `directory` are left alone (the live copy wins).
+    """
+    source = os.path.join(directory, ARCHIVE_DIR, prefix)
+    try:
+        entries = list(os.scandir(source))
+    except OSError:
+        return 0
+    restored = 0
+    for entry in entries:
+        target = os.path.join(directory, entry.name)
+        if os.path.exists(target):
+            continue
+        try:
+            shutil.move(entry.path, target)
+            restored += 1
+        except OSError as e:
+            logger.error(f"[Sessions] Could not restore {entry.name}: {e}")
+    try:
+        os.rmdir(source)
+    except OSError:
+        pass
+    return restored
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
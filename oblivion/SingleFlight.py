@@ -0,0 +1,55 @@
+"""
+Single-flight scheduling for client jobs that must not overlap.
+
+Packets such as ReceivedItems arrive in bursts (especially on reconnect). Each one
+only needs "bring the mod up to date" to happen once more, so triggers are merged:
+at most one run is in flight, and triggers arriving while it runs collapse into a
+single pending rerun.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger("Client")
+
+
+class SingleFlight:
+    """Runs an async job with at most one run in flight and one rerun pending."""
+
+    def __init__(self, job: Callable[[], Awaitable[None]], name: str):
+        self.job = job
+        self.name = name
+        self._task: Optional[asyncio.Task] = None
+        self._pending = False
+        self.triggers = 0
+        self.runs = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Triggers that were merged into another run."""
+        return self.triggers - self.runs
+
+    def trigger(self) -> asyncio.Task:
+        """Request a run. Returns the task that will cover it."""
+        self.triggers += 1
+        self._pending = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self.name)
+        return self._task
+
+    async def _run(self):
+        while self._pending:
+            # Triggers that arrive from here on need another pass
+            self._pending = False
+            self.runs += 1
+            try:
+                await self.job()
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {e}")
+
+    def cancel(self):
+        self._pending = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
@@ -0,0 +1,291 @@
+"""
+Per-session client state store.
+
+The client used to keep its own session state in separate ad-hoc text files
+(`_progression_levels.txt`, `_delivery_cursor.txt`, `_traps_sent.txt`), each parsed
+on its own and rewritten whole on every change. SessionStateStore keeps all of it
+in one SQLite database per session, `<prefix>_state.sqlite3`:
+
+- progressive item levels
+- the item delivery cursor and other scalar values
+- fired trap indices
+- shop scout results
+- location checks not yet confirmed by the server
+
+The database runs in WAL mode where the filesystem allows it (falling back to the
+default rollback journal), so every update is a small atomic transaction. Where
+sqlite3 is unavailable or the database cannot be opened, JsonStateStore provides
+the same interface on top of an atomically replaced JSON file.
+
+Files shared with the mod (`_bridge_status.txt`, `current_connection.txt`) stay
+plain files, since the mod reads or writes them. The legacy client-only files are
+imported once, the first time a session's store is opened.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    import sqlite3
+except ImportError:  # Some embedded Python builds ship without sqlite3
+    sqlite3 = None
+
+logger = logging.getLogger("Client")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS progressive_levels (item TEXT PRIMARY KEY, level INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS traps_sent (idx INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS shop_scouts (location_id INTEGER PRIMARY KEY, entry TEXT);
+CREATE TABLE IF NOT EXISTS pending_checks (location_id INTEGER PRIMARY KEY, seq INTEGER NOT NULL);
+"""
+
+# Marks that the legacy text files have been imported into this store
+IMPORTED_KEY = "legacy_imported"
+
+
+def parse_index_journal(path: str) -> Set[int]:
+    """Read a trap index journal: one index per line, or `start-end` ranges."""
+    indices: Set[int] = set()
+    with open(path, "r") as f:
+        for line in f:
+            start, sep, end = line.strip().partition("-")
+            if not start.isdigit() or (sep and not end.isdigit()):
+                continue
+            if sep:
+                indices.update(range(int(start), int(end) + 1))
+            else:
+                indices.add(int(start))
+    return indices
+
+
+class SessionStateStore:
+    """SQLite-backed state for one session."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        # Only used from the client's bridge I/O thread, which may be restarted between uses
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        try:
+            self.journal_mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # e.g. network filesystems without shared memory support
+            self.journal_mode = "delete"
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """Group several updates into one atomic commit (nestable)."""
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield self
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set(self, key: str, value):
+        self._conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def progressive_levels(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT item, level FROM progressive_levels"))
+
+    def set_progressive_levels(self, levels: Dict[str, int]):
+        self._conn.executemany("INSERT OR REPLACE INTO progressive_levels (item, level) VALUES (?, ?)",
+                               levels.items())
+
+    def trap_indices(self) -> Set[int]:
+        return {row[0] for row in self._conn.execute("SELECT idx FROM traps_sent")}
+
+    def add_trap_indices(self, indices: Iterable[int]):
+        self._conn.executemany("INSERT OR IGNORE INTO traps_sent (idx) VALUES (?)", ((idx,) for idx in indices))
+
+    def remove_trap_indices(self, indices: Iterable[int]):
+        self._conn.executemany("DELETE FROM traps_sent WHERE idx = ?", ((idx,) for idx in indices))
+
+    def shop_scouts(self) -> Dict[int, Optional[dict]]:
+        """Scouted shop locations; the entry is None while the scout result is still unknown."""
+        return {location_id: json.loads(entry) if entry else None
+                for location_id, entry in self._conn.execute("SELECT location_id, entry FROM shop_scouts")}
+
+    def put_shop_scouts(self, scouts: Dict[int, Optional[dict]]):
+        """Record scouted locations. A None entry never replaces a known result."""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO shop_scouts (location_id, entry) VALUES (?, ?)",
+            ((location_id, json.dumps(entry)) for location_id, entry in scouts.items() if entry))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO shop_scouts (location_id, entry) VALUES (?, NULL)",
+            ((location_id,) for location_id, entry in scouts.items() if not entry))
+
+    def pending_checks(self) -> List[int]:
+        """Location checks not yet confirmed by the server, oldest first."""
+        return [row[0] for row in self._conn.execute("SELECT location_id FROM pending_checks ORDER BY seq")]
+
+    def add_pending_checks(self, location_ids: Iterable[int]):
+        row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM pending_checks").fetchone()
+        self._conn.executemany("INSERT OR IGNORE INTO pending_checks (location_id, seq) VALUES (?, ?)",
+                               ((location_id, seq) for seq, location_id in enumerate(location_ids, row[0] + 1)))
+
+    def remove_pending_checks(self, location_ids: Iterable[int]):
+        self._conn.executemany("DELETE FROM pending_checks WHERE location_id = ?",
+                               ((location_id,) for location_id in location_ids))
+
+    def close(self):
+        self._conn.close()
+
+
+class JsonStateStore:
+    """Same interface as SessionStateStore, persisted as one JSON file (fallback)."""
+
+    backend = "json"
+    journal_mode = "replace"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = {"kv": {}, "progressive_levels": {}, "traps_sent": [], "shop_scouts": {},
+                      "pending_checks": []}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._data.update(json.load(f))
+            except ValueError as e:
+                logger.error(f"[State] Corrupt state file {path}, starting over: {e}")
+        self._traps = set(self._data["traps_sent"])
+        self._depth = 0
+
+    def _save(self):
+        if self._depth:
+            return
+        self._data["traps_sent"] = sorted(self._traps)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def transaction(self):
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+        self._save()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._data["kv"].get(key, default)
+
+    def set(self, key: str, value):
+        self._data["kv"][key] = str(value)
+        self._save()
+
+    def progressive_levels(self) -> Dict[str, int]:
+        return dict(self._data["progressive_levels"])
+
+    def set_progressive_levels(self, levels: Dict[str, int]):
+        self._data["progressive_levels"].update(levels)
+        self._save()
+
+    def trap_indices(self) -> Set[int]:
+        return set(self._traps)
+
+    def add_trap_indices(self, indices: Iterable[int]):
+        self._traps.update(indices)
+        self._save()
+
+    def remove_trap_indices(self, indices: Iterable[int]):
+        self._traps.difference_update(indices)
+        self._save()
+
+    def shop_scouts(self) -> Dict[int, Optional[dict]]:
+        return {int(location_id): entry for location_id, entry in self._data["shop_scouts"].items()}
+
+    def put_shop_scouts(self, scouts: Dict[int, Optional[dict]]):
+        known = self._data["shop_scouts"]
+        for location_id, entry in scouts.items():
+            if entry or str(location_id) not in known:
+                known[str(location_id)] = entry
+        self._save()
+
+    def pending_checks(self) -> List[int]:
+        return list(self._data["pending_checks"])
+
+    def add_pending_checks(self, location_ids: Iterable[int]):
+        pending = self._data["pending_checks"]
+        pending.extend(location_id for location_id in dict.fromkeys(location_ids) if location_id not in pending)
+        self._save()
+
+    def remove_pending_checks(self, location_ids: Iterable[int]):
+        confirmed = set(location_ids)
+        self._data["pending_checks"] = [location_id for location_id in self._data["pending_checks"]
+                                        if location_id not in confirmed]
+        self._save()
+
+    def close(self):
+        pass
+
+
+def _import_legacy_files(store, directory: str, prefix: str):
+    """Import the client-only text files written by earlier client versions."""
+    with store.transaction():
+        levels_path = os.path.join(directory, f"{prefix}_progression_levels.txt")
+        if os.path.exists(levels_path):
+            levels = {}
+            with open(levels_path, "r") as f:
+                for line in f:
+                    item_type, sep, count = line.strip().partition("=")
+                    if sep and count.isdigit():
+                        levels[item_type] = int(count)
+            store.set_progressive_levels(levels)
+
+        cursor_path = os.path.join(directory, f"{prefix}_delivery_cursor.txt")
+        if os.path.exists(cursor_path):
+            with open(cursor_path, "r") as f:
+                value = f.readline().strip()
+            if value.isdigit():
+                store.set("delivery_cursor", value)
+
+        traps_path = os.path.join(directory, f"{prefix}_traps_sent.txt")
+        if os.path.exists(traps_path):
+            store.add_trap_indices(parse_index_journal(traps_path))
+
+        store.set(IMPORTED_KEY, "1")
+
+
+def open_state_store(directory: str, prefix: str):
+    """Open (creating if needed) the state store for a session, importing legacy files once."""
+    store = None
+    if sqlite3 is not None:
+        try:
+            store = SessionStateStore(os.path.join(directory, f"{prefix}_state.sqlite3"))
+        except sqlite3.Error as e:
+            logger.warning(f"[State] SQLite state store unavailable ({e}), using JSON fallback")
+    if store is None:
+        store = JsonStateStore(os.path.join(directory, f"{prefix}_state.json"))
+    if store.get(IMPORTED_KEY) is None:
+        try:
+            _import_legacy_files(store, directory, prefix)
+        except (OSError, ValueError) as e:
+            logger.error(f"[State] Could not import legacy session files: {e}")
+    return store
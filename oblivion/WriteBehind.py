@@ -0,0 +1,184 @@
+"""
+Write-behind buffering for the append-only files the client writes for the mod.
+
+Item events, queued items and traps used to be written with one open/append/close
+per message, which in a busy room means hundreds of syscalls a second against a
+slow (Proton/NTFS) save directory. WriteBehindWriter collects appends per file and
+writes each file once per flush window, flushing early when enough data is
+buffered and always on shutdown. Appends keep their order within a file.
+
+Failed writes keep their data buffered and are retried on the next flush, so an
+append never loses data silently. State that must only be persisted once the
+appended data is on disk (delivery cursor, sent trap indices) is registered with
+call_after_flush().
+
+Given a BridgeIO, timed flushes run on its I/O thread instead of the event loop.
+The buffers are guarded by a lock held across each write, so a flush from either
+thread keeps appends in order, and after-flush callbacks always run on the loop.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from .BridgeIO import BridgeIO
+
+logger = logging.getLogger("Client")
+
+
+class WriteBehindWriter:
+    """Coalesces appends per file and writes them after a short delay."""
+
+    def __init__(self, delay: float = 0.05, max_bytes: int = 64 * 1024, retry_delay: float = 1.0,
+                 io: Optional["BridgeIO"] = None):
+        self.delay = delay
+        self.max_bytes = max_bytes
+        self.retry_delay = retry_delay
+        self.io = io
+        self._lock = threading.RLock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # path -> buffered chunks (str for text files, bytes for binary files)
+        self._buffers: Dict[str, List[Union[str, bytes]]] = {}
+        self._after_flush: List[Callable[[], None]] = []
+        self._handle: Optional[asyncio.TimerHandle] = None
+        # Flushes queued on the I/O thread but not finished yet
+        self._flushing = 0
+        self.pending_bytes = 0
+        # Metrics
+        self.appends = 0
+        self.flushes = 0
+        self.file_writes = 0
+        self.errors = 0
+        self.peak_pending_bytes = 0
+        self.peak_pending_chunks = 0
+
+    @property
+    def pending_chunks(self) -> int:
+        return sum(len(chunks) for chunks in self._buffers.values())
+
+    @property
+    def pending_files(self) -> int:
+        return len(self._buffers)
+
+    def append(self, path: str, data: Union[str, bytes]):
+        """Queue data to be appended to `path`. Text and binary appends must not be mixed per file."""
+        if not data:
+            return
+        with self._lock:
+            self._buffers.setdefault(path, []).append(data)
+            self.appends += 1
+            self.pending_bytes += len(data)
+            self.peak_pending_bytes = max(self.peak_pending_bytes, self.pending_bytes)
+            self.peak_pending_chunks = max(self.peak_pending_chunks, self.pending_chunks)
+            full = self.pending_bytes >= self.max_bytes
+        self._schedule(0 if full else self.delay)
+
+    def append_lines(self, path: str, lines: List[str]):
+        self.append(path, "".join(f"{line}\n" for line in lines))
+
+    def call_after_flush(self, callback: Callable[[], None]):
+        """Run `callback` once everything appended so far has been written."""
+        with self._lock:
+            if self._buffers or self._flushing:
+                self._after_flush.append(callback)
+                callback = None
+        if callback is None:
+            self._schedule(self.delay)
+        else:
+            callback()
+
+    def _schedule(self, delay: float):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None and self._loop.is_running() and not self._loop.is_closed():
+                # Called from the I/O thread (retry after a failed write)
+                self._loop.call_soon_threadsafe(self._schedule, delay)
+                return
+            # No event loop (startup/shutdown paths): write through
+            self.flush()
+            return
+        self._loop = loop
+        if self._handle is not None:
+            if delay > 0:
+                return
+            self._handle.cancel()
+        self._handle = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._handle = None
+        if self.io is not None:
+            with self._lock:
+                self._flushing += 1
+            self.io.submit(self._flush_in_background)
+        else:
+            self.flush()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._flushing -= 1
+            self._run_after_flush()
+
+    def flush(self, path: Optional[str] = None) -> bool:
+        """Write buffered data (only for `path` if given). Returns False if a write failed."""
+        if path is None and self._handle is not None and not (self.io and self.io.on_io_thread()):
+            self._handle.cancel()
+            self._handle = None
+        ok = True
+        with self._lock:
+            paths = [path] if path is not None else list(self._buffers)
+            for file_path in paths:
+                chunks = self._buffers.get(file_path)
+                if not chunks:
+                    continue
+                binary = isinstance(chunks[0], bytes)
+                data = b"".join(chunks) if binary else "".join(chunks)
+                try:
+                    with open(file_path, "ab" if binary else "a") as f:
+                        f.write(data)
+                except OSError as e:
+                    self.errors += 1
+                    ok = False
+                    logger.error(f"[Bridge] Buffered write to {file_path} failed, will retry: {e}")
+                    continue
+                del self._buffers[file_path]
+                self.pending_bytes -= len(data)
+                self.file_writes += 1
+            self.flushes += 1
+
+        if not ok:
+            self._schedule(self.retry_delay)
+        else:
+            self._run_after_flush()
+        return ok
+
+    def _run_after_flush(self):
+        """Run the after-flush callbacks once nothing is buffered or being written (on the loop)."""
+        with self._lock:
+            if self._buffers or self._flushing or not self._after_flush:
+                return
+            callbacks, self._after_flush = self._after_flush, []
+        if self.io and self.io.on_io_thread() and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._call_all, callbacks)
+        else:
+            self._call_all(callbacks)
+
+    @staticmethod
+    def _call_all(callbacks: List[Callable[[], None]]):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"[Bridge] After-flush callback failed: {e}")
+
+    def close(self):
+        """Flush everything, e.g. on disconnect or shutdown."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self.flush()
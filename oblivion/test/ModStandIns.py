@@ -0,0 +1,186 @@
+"""
+Stand-ins for the game mod's side of the bridge protocols.
+
+They read and write the same files (or socket frames) the mod does, so the
+client's transports can be exercised on any platform without the game.
+"""
+
+import asyncio
+import os
+from typing import List, Optional
+
+from ..Bridge import RotatingFileConsumer
+from ..BridgeJournal import (ACK, BRIDGE_PROTOCOL_VERSION, COMPLETED, DEATHLINK, EVENT, HELLO, ITEM, RECEIVED,
+                             TRAP, Frame, JournalReader, JournalWriter, encode_frames, parse_frames,
+                             split_indexed)
+
+
+class LocalModStandIn:
+    """Plays the mod's side of the journal protocol."""
+
+    def __init__(self, directory: str, prefix: str):
+        self.to_client = JournalWriter(os.path.join(directory, f"{prefix}_from_mod.journal"))
+        self.from_client = JournalReader(os.path.join(directory, f"{prefix}_to_mod.journal"))
+        self.items: List[str] = []
+        self.traps: List[str] = []
+        self.item_events: List[str] = []
+        self.deathlinks = 0
+        self.received_index = -1
+
+    def start(self):
+        self.to_client.append([(HELLO, str(BRIDGE_PROTOCOL_VERSION))])
+
+    def complete(self, *lines: str):
+        """Report completion lines to the client, as the game would."""
+        self.to_client.append((COMPLETED, line) for line in lines)
+
+    def poll(self) -> int:
+        """Apply everything the client sent and acknowledge it. Returns the number of frames applied."""
+        frames = self.from_client.read()
+        received_index = self.received_index
+        for frame in frames:
+            if frame.kind in (ITEM, TRAP):
+                index, values = split_indexed(frame.payload)
+                if index is not None and index <= self.received_index:
+                    # Already applied (e.g. the stand-in restarted and re-read the journal)
+                    continue
+                (self.items if frame.kind == ITEM else self.traps).extend(values)
+                if index is not None:
+                    received_index = max(received_index, index)
+            elif frame.kind == EVENT:
+                self.item_events.append(frame.payload)
+            elif frame.kind == DEATHLINK:
+                self.deathlinks += 1
+            elif frame.kind == ACK and frame.payload.isdigit():
+                self.to_client.acked = max(self.to_client.acked, int(frame.payload))
+        if received_index > self.received_index:
+            self.received_index = received_index
+            self.to_client.append([(RECEIVED, str(received_index))])
+        if frames:
+            self.to_client.append([(ACK, str(frames[-1].seq))])
+            self.to_client.compact()
+        return len(frames)
+
+
+class LegacyModStandIn:
+    """Plays the mod's side of the plain text file protocol."""
+
+    def __init__(self, directory: str, prefix: str):
+        self.directory = directory
+        self.prefix = prefix
+        self.items: List[str] = []
+        self.traps: List[str] = []
+        self.deathlinks = 0
+        self._items = RotatingFileConsumer(self._path("items.txt"))
+        self._traps = RotatingFileConsumer(self._path("traps.txt"))
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{suffix}")
+
+    def complete(self, *lines: str):
+        with open(self._path("completed.txt"), "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+
+    def poll(self) -> int:
+        """Process queued items/traps/deathlinks like the mod does. Returns the number applied."""
+        applied = 0
+        items = self._items.claim()
+        if items is not None:
+            self.items.extend(items)
+            if items:
+                with open(self._path("bridge_status.txt"), "a") as f:
+                    f.write("".join(f"{item}," for item in items))
+            self._items.commit()
+            applied += len(items)
+        traps = self._traps.claim()
+        if traps is not None:
+            self.traps.extend(traps)
+            self._traps.commit()
+            applied += len(traps)
+        try:
+            os.remove(self._path("deathlink.txt"))
+            self.deathlinks += 1
+            applied += 1
+        except FileNotFoundError:
+            pass
+        return applied
+
+
+class SocketModStandIn:
+    """Plays the mod's side of the socket bridge."""
+
+    def __init__(self, address: str, prefix: str, token: str):
+        self.address = address
+        self.prefix = prefix
+        self.token = token
+        self.items: List[str] = []
+        self.traps: List[str] = []
+        self.item_events: List[str] = []
+        self.deathlinks = 0
+        self.received_index = -1
+        self.last_seq = 0
+        self._peer_seq = 0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self.applied = asyncio.Event()
+
+    async def connect(self):
+        kind, _, location = self.address.partition(":")
+        if kind == "unix":
+            self._reader, self._writer = await asyncio.open_unix_connection(location)
+        else:
+            host, _, port = location.rpartition(":")
+            self._reader, self._writer = await asyncio.open_connection(host, int(port))
+        self._send([(HELLO, f"{BRIDGE_PROTOCOL_VERSION} {self.prefix} {self.token}")])
+        self._task = asyncio.create_task(self._read())
+
+    def _send(self, entries):
+        frames = []
+        for kind, payload in entries:
+            self.last_seq += 1
+            frames.append(Frame(self.last_seq, kind, payload))
+        self._writer.write(encode_frames(frames))
+
+    def complete(self, *lines: str):
+        """Report completion lines to the client, as the game would."""
+        self._send((COMPLETED, line) for line in lines)
+
+    async def _read(self):
+        buffer = b""
+        while True:
+            data = await self._reader.read(65536)
+            if not data:
+                break
+            frames, consumed = parse_frames(buffer + data)
+            buffer = (buffer + data)[consumed:]
+            received_index = self.received_index
+            for frame in frames:
+                if frame.seq <= self._peer_seq:
+                    continue
+                self._peer_seq = frame.seq
+                if frame.kind in (ITEM, TRAP):
+                    index, values = split_indexed(frame.payload)
+                    if index is not None and index <= self.received_index:
+                        continue
+                    (self.items if frame.kind == ITEM else self.traps).extend(values)
+                    if index is not None:
+                        received_index = max(received_index, index)
+                elif frame.kind == EVENT:
+                    self.item_events.append(frame.payload)
+                elif frame.kind == DEATHLINK:
+                    self.deathlinks += 1
+            reply = []
+            if received_index > self.received_index:
+                self.received_index = received_index
+                reply.append((RECEIVED, str(received_index)))
+            if frames:
+                reply.append((ACK, str(self._peer_seq)))
+                self._send(reply)
+                self.applied.set()
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            self._writer.close()
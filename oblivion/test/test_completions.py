@@ -0,0 +1,89 @@
+import unittest
+
+from .. import Completions
+from ..Completions import CompletionRouter, LocationCursor
+from ..Locations import location_table
+
+
+def location_id(name: str) -> int:
+    return location_table[name].id
+
+
+class TestLocationCursor(unittest.TestCase):
+    def setUp(self):
+        self.cursor = LocationCursor([10, 11, 12, 13])
+        self.missing = {10, 11, 12, 13}
+        self.cursor.seed(self.missing)
+
+    def test_hands_out_locations_in_order_once(self):
+        self.assertEqual(self.cursor.peek(self.missing), 10)
+        self.assertEqual(self.cursor.take(self.missing), 10)
+        # Still missing until the server confirms it, but never handed out twice
+        self.assertEqual(self.cursor.take(self.missing), 11)
+
+    def test_skips_locations_checked_elsewhere(self):
+        self.missing -= {10, 12}
+        self.assertEqual(self.cursor.take_many(self.missing, 5), [11, 13])
+        self.assertIsNone(self.cursor.take(self.missing))
+
+    def test_peek_many_does_not_consume(self):
+        self.assertEqual(self.cursor.peek_many(self.missing, 2), [10, 11])
+        self.assertEqual(self.cursor.take_many(self.missing, 3), [10, 11, 12])
+
+    def test_seed_only_keeps_missing_locations(self):
+        self.cursor.seed({12})
+        self.assertEqual(self.cursor.take_many(self.missing, 4), [12])
+
+    def test_reseed_skips_locations_awaiting_confirmation(self):
+        pending = {self.cursor.take(self.missing)}
+        # Reconnect: the sent check is still missing on the server
+        self.cursor.seed(self.missing, pending)
+        self.assertEqual(self.cursor.take_many(self.missing, 4), [11, 12, 13])
+
+
+class TestCompletionRouter(unittest.TestCase):
+    def setUp(self):
+        slot_data = {"selected_sidequests": [], "selected_dungeons": ["Amelion Tomb"],
+                     "nirnroot_count": 10, "dungeon_kills": 3, "overworld_kills": 0}
+        self.router = CompletionRouter(slot_data, {"APAzuraCompletionToken": "Azura Quest Complete"})
+
+    def test_exact_tokens(self):
+        self.assertEqual(self.router.route("APAzuraCompletionToken"),
+                         (Completions.LOCATION, location_id("Azura Quest Complete"), "Azura Quest Complete", 1))
+        self.assertEqual(self.router.route("Victory").kind, Completions.VICTORY)
+        self.assertEqual(self.router.route("Deathlink").kind, Completions.DEATHLINK)
+        # Unselected sidequest
+        self.assertEqual(self.router.route("Ayleid Well Visited").kind, Completions.IGNORE)
+
+    def test_counted_events(self):
+        self.assertEqual(self.router.route("Dungeon Kill|12"), (Completions.KILL, "dungeon", "", 12))
+        self.assertEqual(self.router.route("Nirnroot Harvested|3").count, 3)
+        # Only counted kinds accept a count
+        self.assertEqual(self.router.route("Victory|2").kind, Completions.UNKNOWN)
+
+    def test_parametric_events(self):
+        self.assertEqual(self.router.route("Amelion Tomb Dungeon Cleared").value, location_id("Amelion Tomb"))
+        self.assertIsNone(self.router.route("Atatar Dungeon Cleared").value)
+        self.assertEqual(self.router.route("500 Gold Collected").value, location_id("Gold: 500 Collected"))
+        self.assertIsNone(self.router.route("lots Gold Collected").value)
+        self.assertEqual(self.router.route("Acrobatics Skill Increase"), (Completions.SKILL, "Acrobatics", "Acrobatics", 1))
+        self.assertEqual(self.router.route("Tower Doomstone Visited").value, location_id("Visit the Tower Stone"))
+        self.assertEqual(self.router.route("Something Else").kind, Completions.UNKNOWN)
+
+    def test_family_cursors(self):
+        gates = [location_id(f"Gate {i} Closed") for i in range(1, 4)]
+        kills = [location_id(f"Dungeon Kill {i}") for i in range(1, 4)]
+        missing = set(gates[1:] + kills)
+        self.router.seed(missing)
+        self.assertEqual(self.router.gate_cursor.take(missing), gates[1])
+        self.assertEqual(self.router.kill_cursors["dungeon"].take_many(missing, 5), kills)
+        self.assertEqual(self.router.kill_names[kills[0]], "Dungeon Kill 1")
+        self.assertEqual(len(self.router.nirnroot_cursor.location_ids), 10)
+
+    def test_reseed_never_hands_out_pending_checks(self):
+        gates = [location_id(f"Gate {i} Closed") for i in range(1, 4)]
+        missing = set(gates)
+        self.router.seed(missing)
+        pending = {self.router.gate_cursor.take(missing): 0.0}
+        self.router.seed(missing, pending)
+        self.assertEqual(self.router.gate_cursor.take_many(missing, 5), gates[1:])
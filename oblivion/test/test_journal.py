@@ -0,0 +1,204 @@
+import os
+import tempfile
+import unittest
+
+from ..BridgeJournal import (COMPACT_THRESHOLD, ITEM, JOURNAL, Frame, JournalReader, JournalTransport, JournalWriter,
+                             encode_frames, mod_supports_journal, parse_frames)
+from .ModStandIns import LocalModStandIn
+
+PREFIX = "AP_Player_0123abcd"
+
+
+class TestFraming(unittest.TestCase):
+    def test_round_trip_escapes_separators(self):
+        frames = [Frame(1, ITEM, "3\tSword\\of\nDoom"), Frame(2, "ack", ""), Frame(3, "event", "a\rb")]
+        parsed, consumed = parse_frames(encode_frames(frames))
+        self.assertEqual(parsed, frames)
+        self.assertEqual(consumed, len(encode_frames(frames)))
+
+    def test_partial_frame_is_left_for_the_next_read(self):
+        data = encode_frames([Frame(1, ITEM, "0\tA")]) + b"2\titem\t1\tB"
+        parsed, consumed = parse_frames(data)
+        self.assertEqual(parsed, [Frame(1, ITEM, "0\tA")])
+        self.assertEqual(data[consumed:], b"2\titem\t1\tB")
+
+    def test_malformed_lines_are_skipped(self):
+        parsed, _ = parse_frames(b"garbage\nx\titem\tA\n4\titem\t\tB\n")
+        self.assertEqual(parsed, [Frame(4, ITEM, "\tB")])
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = self._tmp.name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{PREFIX}_{name}")
+
+
+class TestJournalFiles(JournalTestCase):
+    def test_writer_recovers_its_sequence(self):
+        writer = JournalWriter(self.path("to_mod.journal"))
+        writer.append([(ITEM, "0\tA"), (ITEM, "1\tB")])
+        reopened = JournalWriter(self.path("to_mod.journal"))
+        self.assertEqual(reopened.last_seq, 2)
+        self.assertEqual(reopened.generation, writer.generation)
+        self.assertEqual(reopened.append([(ITEM, "2\tC")]), 3)
+
+    def test_sequence_survives_compaction_of_every_frame(self):
+        writer = JournalWriter(self.path("to_mod.journal"))
+        writer.append([(ITEM, "0\tA"), (ITEM, "1\tB")])
+        writer.acked = 2
+        self.assertTrue(writer.compact(force=True))
+        self.assertEqual(JournalWriter(self.path("to_mod.journal")).last_seq, 2)
+
+    def test_reader_waits_for_a_complete_frame(self):
+        path = self.path("from_mod.journal")
+        JournalWriter(path)
+        reader = JournalReader(path)
+        with open(path, "ab") as f:
+            f.write(b"1\tcompleted\tGate")
+        self.assertEqual(reader.read(), [])
+        with open(path, "ab") as f:
+            f.write(b" 1 Closed\n")
+        self.assertEqual(reader.read(), [Frame(1, "completed", "Gate 1 Closed")])
+        self.assertEqual(reader.read(), [])
+
+    def test_reader_restarts_on_a_new_generation(self):
+        path = self.path("to_mod.journal")
+        writer = JournalWriter(path)
+        writer.append([(ITEM, "0\tA"), (ITEM, "1\tB")])
+        reader = JournalReader(path)
+        self.assertEqual([frame.seq for frame in reader.read()], [1, 2])
+        writer.acked = 1
+        writer.compact(force=True)
+        writer.append([(ITEM, "2\tC")])
+        # Frame 2 survives the compaction but was already seen
+        self.assertEqual(reader.read(), [Frame(3, ITEM, "2\tC")])
+        self.assertEqual(reader.generation, writer.generation)
+
+
+class TestJournalTransport(JournalTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mod = LocalModStandIn(self.directory, PREFIX)
+
+    def test_mod_announcement(self):
+        self.assertFalse(mod_supports_journal(self.directory, PREFIX))
+        self.mod.start()
+        self.assertTrue(mod_supports_journal(self.directory, PREFIX))
+
+    def test_round_trip(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        transport.send_items(["APArenaPitDogUnlock", "APArmorTier2"], index=0)
+        transport.send_traps([(1, "TrapFrenzy")])
+        transport.send_deathlink()
+        transport.send_item_event("received|Sword|Player2")
+        self.assertEqual(self.mod.poll(), 4)
+        self.assertEqual(self.mod.items, ["APArenaPitDogUnlock", "APArmorTier2"])
+        self.assertEqual(self.mod.traps, ["TrapFrenzy"])
+        self.assertEqual(self.mod.deathlinks, 1)
+        self.assertEqual(self.mod.item_events, ["received|Sword|Player2"])
+        self.assertEqual(transport.next_item_index(), 2)
+
+        self.mod.complete("Gate 1 Closed", "Nirnroot Harvested")
+        self.assertTrue(transport.completions_pending())
+        self.assertEqual(transport.claim_completions(), ["Gate 1 Closed", "Nirnroot Harvested"])
+        # Claimed but not committed: the same lines come back
+        self.assertEqual(transport.claim_completions(), ["Gate 1 Closed", "Nirnroot Harvested"])
+        transport.commit_completions()
+        self.assertIsNone(transport.claim_completions())
+
+    def test_client_restart_resumes_from_its_acks(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        transport.send_items(["A"], index=0)
+        transport.send_items(["B"], index=1)
+        self.mod.complete("Gate 1 Closed")
+        transport.claim_completions()
+        transport.commit_completions()
+        self.mod.poll()
+        self.mod.complete("Gate 2 Closed")
+
+        restarted = JournalTransport(self.directory, PREFIX)
+        self.assertEqual(restarted.next_item_index(), 2)
+        # Only the completion the previous client did not acknowledge is handed out again
+        self.assertEqual(restarted.claim_completions(), ["Gate 2 Closed"])
+
+    def test_unapplied_items_count_as_sent(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        transport.send_items(["A"], index=0)
+        restarted = JournalTransport(self.directory, PREFIX)
+        self.assertEqual(restarted.next_item_index(), 1)
+        self.mod.poll()
+        self.assertEqual(self.mod.items, ["A"])
+
+    def test_legacy_completions_are_drained(self):
+        with open(self.path("completed.txt"), "w") as f:
+            f.write("Gate 1 Closed\n")
+        self.mod.start()
+        self.mod.complete("Gate 2 Closed")
+        transport = JournalTransport(self.directory, PREFIX)
+        self.assertEqual(transport.claim_completions(), ["Gate 1 Closed", "Gate 2 Closed"])
+        transport.commit_completions()
+        self.assertFalse(os.path.exists(self.path("completed_processing.txt")))
+        self.assertIsNone(transport.claim_completions())
+
+    def fill_journal(self, transport: JournalTransport, start: int) -> int:
+        index = start
+        while os.path.getsize(transport.to_mod.path) < COMPACT_THRESHOLD:
+            transport.send_items([f"APClassLevel{index % 20 + 1}"] * 20, index=index)
+            index += 1
+        return index
+
+    def test_compaction_after_acks(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        next_index = self.fill_journal(transport, 0)
+        generation = transport.to_mod.generation
+        size = os.path.getsize(transport.to_mod.path)
+
+        # Nothing acknowledged yet: the journal keeps its generation
+        transport.next_item_index()
+        self.assertEqual(transport.to_mod.generation, generation)
+
+        self.mod.poll()
+        self.assertEqual(transport.next_item_index(), next_index)
+        self.assertNotEqual(transport.to_mod.generation, generation)
+        self.assertLess(os.path.getsize(transport.to_mod.path), size // 2)
+
+        # The mod follows the new generation without applying anything twice
+        applied = len(self.mod.items)
+        transport.send_items(["APArmorTier4"], index=next_index)
+        self.mod.poll()
+        self.assertEqual(self.mod.items[applied:], ["APArmorTier4"])
+        self.assertEqual(JournalTransport(self.directory, PREFIX).next_item_index(), next_index + 1)
+
+    def test_idle_journal_is_not_compacted_again(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        self.fill_journal(transport, 0)
+        self.mod.poll()
+        transport.next_item_index()
+        self.fill_journal(transport, 10_000)
+        generation = transport.to_mod.generation
+        for _ in range(3):
+            transport.next_item_index()
+        self.assertEqual(transport.to_mod.generation, generation)
+
+    def test_compaction_keeps_the_ack_frame(self):
+        self.mod.start()
+        transport = JournalTransport(self.directory, PREFIX)
+        self.mod.complete("Gate 1 Closed")
+        transport.claim_completions()
+        transport.commit_completions()
+        self.mod.poll()
+        transport.next_item_index()
+        transport.to_mod.compact(force=True)
+        with open(transport.to_mod.path, "rb") as f:
+            kinds = [frame.kind for frame in parse_frames(f.read())[0]]
+        self.assertEqual(kinds, [JOURNAL, "ack"])
+        self.assertEqual(JournalTransport(self.directory, PREFIX).applied_seq, transport.applied_seq)
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from ..Bridge import LegacyFileTransport, RotatingFileConsumer, compact_queue_file, count_queue_lines
+from ..WriteBehind import WriteBehindWriter
+from .ModStandIns import LegacyModStandIn
+
+PREFIX = "AP_Player_0123abcd"
+
+
+class LegacyTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = self._tmp.name
+        self.mod = LegacyModStandIn(self.directory, PREFIX)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{PREFIX}_{name}")
+
+
+class TestLegacyTransport(LegacyTestCase):
+    def test_round_trip(self):
+        transport = LegacyFileTransport(self.directory, PREFIX)
+        transport.send_items(["APArenaPitDogUnlock", "APArmorTier2"], index=0)
+        transport.send_traps([(1, "TrapFrenzy")])
+        transport.send_deathlink()
+        self.assertEqual(self.mod.poll(), 4)
+        self.assertEqual(self.mod.items, ["APArenaPitDogUnlock", "APArmorTier2"])
+        self.assertEqual(self.mod.traps, ["TrapFrenzy"])
+        self.assertEqual(self.mod.deathlinks, 1)
+        self.assertEqual(self.mod.poll(), 0)
+
+        self.mod.complete("Gate 1 Closed")
+        self.assertTrue(transport.completions_pending())
+        self.assertEqual(transport.claim_completions(), ["Gate 1 Closed"])
+        transport.commit_completions()
+        self.assertIsNone(transport.claim_completions())
+
+    def test_counted_items(self):
+        transport = LegacyFileTransport(self.directory, PREFIX)
+        transport.counted_items = True
+        transport.send_items(["Potion", "Potion", "Scroll", "Potion"])
+        with open(self.path("items.txt")) as f:
+            self.assertEqual(f.read(), "Potion|3\nScroll\n")
+
+    def test_buffered_items_reach_the_mod_after_a_flush(self):
+        writer = WriteBehindWriter()
+        transport = LegacyFileTransport(self.directory, PREFIX, writer)
+        transport.send_items(["A", "B"])
+        transport.send_items(["C"])
+        self.assertEqual(self.mod.items, [])
+        writer.flush()
+        self.mod.poll()
+        self.assertEqual(self.mod.items, ["A", "B", "C"])
+
+    def test_client_restart_keeps_claimed_completions(self):
+        self.mod.complete("Gate 1 Closed")
+        LegacyFileTransport(self.directory, PREFIX).claim_completions()
+        # Appended while the claimed file was being handled
+        self.mod.complete("Gate 2 Closed")
+
+        # A client that died before committing gets the claimed lines again, then the new ones
+        restarted = LegacyFileTransport(self.directory, PREFIX)
+        self.assertEqual(restarted.claim_completions(), ["Gate 1 Closed"])
+        restarted.commit_completions()
+        self.assertEqual(restarted.claim_completions(), ["Gate 2 Closed"])
+        restarted.commit_completions()
+        self.assertIsNone(restarted.claim_completions())
+
+
+class TestQueueFiles(LegacyTestCase):
+    def test_consumer_without_a_file(self):
+        consumer = RotatingFileConsumer(self.path("completed.txt"))
+        self.assertFalse(consumer.pending())
+        self.assertIsNone(consumer.claim())
+        consumer.commit()
+
+    def test_compact_queue_file(self):
+        with open(self.path("items.txt"), "w") as f:
+            f.write("Potion\nScroll\nPotion|2\nPotion\n")
+        self.assertEqual(compact_queue_file(self.path("items.txt")), (4, 2))
+        with open(self.path("items.txt")) as f:
+            self.assertEqual(count_queue_lines(line.strip() for line in f), {"Potion": 4, "Scroll": 1})
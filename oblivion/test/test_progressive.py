@@ -0,0 +1,36 @@
+import unittest
+
+from ..Items import arena_unlock_item_name, progressive_shop_stock_item_name
+from ..Progressive import EXPANSION_TABLES, PROGRESSIVE_LEVELS, ExpansionTable, expand_progressive, max_level
+
+
+class TestExpansionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = ExpansionTable([["A"], ["B1", "B2"], ["C"]])
+
+    def test_levels(self):
+        self.assertEqual(self.table.max_level, 3)
+        self.assertEqual(self.table.expand(0, 1), ["A"])
+        self.assertEqual(self.table.expand(1, 2), ["B1", "B2"])
+        self.assertEqual(self.table.expand(0, 3), ["A", "B1", "B2", "C"])
+
+    def test_out_of_range_counts_are_clamped(self):
+        self.assertEqual(self.table.expand(-2, 1), ["A"])
+        self.assertEqual(self.table.expand(2, 10), ["C"])
+        self.assertEqual(self.table.expand(3, 4), [])
+        self.assertEqual(self.table.expand(2, 1), [])
+
+
+class TestProgressiveTables(unittest.TestCase):
+    def test_tables_match_the_levels(self):
+        self.assertEqual(set(EXPANSION_TABLES), set(PROGRESSIVE_LEVELS))
+        for item_name, levels in PROGRESSIVE_LEVELS.items():
+            self.assertEqual(max_level(item_name), len(levels))
+            for level, tokens in enumerate(levels):
+                self.assertEqual(expand_progressive(item_name, level, level + 1), tokens)
+
+    def test_known_items(self):
+        self.assertEqual(expand_progressive(arena_unlock_item_name, 0, 2), ["APArenaPitDogUnlock", "APArenaBrawlerUnlock"])
+        self.assertEqual(expand_progressive(progressive_shop_stock_item_name, 3, 4),
+                         ["APShopCheckValue5", "APShopCheckValue50", "APShopCheckValue500"])
+        self.assertEqual(expand_progressive(arena_unlock_item_name, 7, 8), [])
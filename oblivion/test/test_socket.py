@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+from ..BridgeSocket import MAX_LINE_BYTES, SocketBridgeServer
+from .ModStandIns import SocketModStandIn
+
+PREFIX = "AP_Player_0123abcd"
+
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached in time")
+        await asyncio.sleep(0.01)
+
+
+class TestSocketBridge(unittest.IsolatedAsyncioTestCase):
+    kind = "tcp"
+
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.server = SocketBridgeServer(self.kind, unix_path=os.path.join(self._tmp.name, "bridge.sock"))
+        await self.server.start()
+        self.transport = self.server.transport
+        self.mods = []
+
+    async def asyncTearDown(self):
+        for mod in self.mods:
+            await mod.close()
+        await self.server.stop()
+
+    async def connect_mod(self) -> SocketModStandIn:
+        mod = SocketModStandIn(self.server.address, PREFIX, self.server.token)
+        self.mods.append(mod)
+        await mod.connect()
+        await wait_until(lambda: self.transport.connected)
+        return mod
+
+    async def disconnect_mod(self, mod: SocketModStandIn):
+        await mod.close()
+        await wait_until(lambda: not self.transport.connected)
+
+    async def test_round_trip(self):
+        mod = await self.connect_mod()
+        self.transport.send_items(["APArenaPitDogUnlock"], index=0)
+        self.transport.send_traps([(1, "TrapFrenzy")])
+        self.transport.send_deathlink()
+        self.transport.send_item_event("found|Sword|Gate 1 Closed")
+        await wait_until(lambda: mod.deathlinks == 1)
+        self.assertEqual(mod.items, ["APArenaPitDogUnlock"])
+        self.assertEqual(mod.traps, ["TrapFrenzy"])
+        self.assertEqual(mod.item_events, ["found|Sword|Gate 1 Closed"])
+        await wait_until(lambda: self.transport.delivered_index == 1)
+
+        mod.complete("Gate 1 Closed")
+        await wait_until(self.transport.completions_pending)
+        self.assertEqual(self.transport.claim_completions(), ["Gate 1 Closed"])
+        self.transport.commit_completions()
+        self.assertIsNone(self.transport.claim_completions())
+
+    async def test_unacknowledged_frames_are_resent_on_reconnect(self):
+        mod = await self.connect_mod()
+        self.transport.send_items(["A"], index=0)
+        await wait_until(lambda: self.transport.acked == self.transport.last_seq)
+        await self.disconnect_mod(mod)
+
+        self.transport.send_items(["B"], index=1)
+        mod = await self.connect_mod()
+        await wait_until(lambda: mod.items)
+        # Only the frame sent while disconnected went out again
+        self.assertEqual(mod.items, ["B"])
+
+    async def test_game_restart_resets_the_peer_sequence(self):
+        mod = await self.connect_mod()
+        mod.complete("Gate 1 Closed")
+        await wait_until(self.transport.completions_pending)
+        self.transport.claim_completions()
+        self.transport.commit_completions()
+        await self.disconnect_mod(mod)
+
+        # A restarted game numbers its frames from 1 again
+        mod = await self.connect_mod()
+        mod.complete("Gate 2 Closed")
+        await wait_until(self.transport.completions_pending)
+        self.assertEqual(self.transport.claim_completions(), ["Gate 2 Closed"])
+
+    async def test_fallback_hands_back_undelivered_items(self):
+        mod = await self.connect_mod()
+        self.transport.send_items(["A"], index=0)
+        await wait_until(lambda: self.transport.delivered_index == 0)
+        await self.disconnect_mod(mod)
+        self.transport.send_items(["B"], index=1)
+        self.transport.send_traps([(2, "TrapFrenzy")])
+        self.transport.send_deathlink()
+        self.assertEqual(self.transport.take_undelivered(), [1, 2])
+        self.assertEqual(self.transport.take_undelivered(), [])
+
+    async def assert_rejected(self, opening: bytes, tail: bytes = b"2\tcompleted\tGate 1 Closed\n"):
+        host, _, port = self.server.address.partition(":")[2].rpartition(":")
+        if self.kind == "unix":
+            reader, writer = await asyncio.open_unix_connection(self.server.unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, int(port))
+        writer.write(opening + tail)
+        self.assertEqual(await asyncio.wait_for(reader.read(), 2.0), b"")
+        writer.close()
+        self.assertFalse(self.transport.connected)
+        self.assertFalse(self.transport.completions_pending())
+
+    async def test_connection_without_hello_is_rejected(self):
+        await self.assert_rejected(b"")
+
+    async def test_connection_without_the_token_is_rejected(self):
+        await self.assert_rejected(f"1\thello\t2 {PREFIX}\n".encode())
+        await self.assert_rejected(f"1\thello\t2 {PREFIX} {'0' * 32}\n".encode())
+
+    async def test_oversized_line_is_rejected(self):
+        await self.assert_rejected(b"1\thello\t" + b"x" * (MAX_LINE_BYTES + 1), tail=b"")
+
+
+@unittest.skipIf(sys.platform == "win32", "Unix sockets are for Linux tooling")
+class TestUnixSocketBridge(TestSocketBridge):
+    kind = "unix"
+
+    def test_socket_is_owner_only(self):
+        self.assertEqual(os.stat(self.server.unix_path).st_mode & 0o777, 0o600)
+
+    async def test_default_socket_lives_in_a_private_directory(self):
+        server = SocketBridgeServer("unix")
+        await server.start()
+        socket_dir = os.path.dirname(server.unix_path)
+        try:
+            self.assertEqual(os.stat(socket_dir).st_mode & 0o777, 0o700)
+            self.assertEqual(server.address, f"unix:{server.unix_path}")
+        finally:
+            await server.stop()
+        self.assertFalse(os.path.exists(socket_dir))
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from ..FileWatcher import PollingWatcher
+
+
+class TestPollingWatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.watcher = PollingWatcher(self._tmp.name, ["a.txt", "b.txt"])
+        self.watcher.start()
+        self.addCleanup(self.watcher.stop)
+
+    def write(self, name: str):
+        with open(os.path.join(self._tmp.name, name), "a") as f:
+            f.write("line\n")
+
+    async def test_reports_changed_names(self):
+        self.write("b.txt")
+        self.write("other.txt")
+        self.assertTrue(await self.watcher.wait(1.0))
+        self.assertEqual(self.watcher.take_changed(), {"b.txt"})
+        self.assertEqual(self.watcher.take_changed(), set())
+
+    async def test_forced_notify_counts_every_name(self):
+        self.watcher.notify()
+        self.assertTrue(await self.watcher.wait(1.0))
+        self.assertEqual(self.watcher.take_changed(), {"a.txt", "b.txt"})
+
+    async def test_idle_interval_stays_capped(self):
+        self.assertFalse(await self.watcher.wait(0.5))
+        self.assertLessEqual(self.watcher.interval, 0.1)